@@ -0,0 +1,273 @@
+from statistics import median
+from typing import Callable
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+
+ROOT: str = os.path.dirname(os.path.abspath(__file__))
+STARTUP_BUDGET: float = 1.0 # s, from interpreter start until window accepts typing
+STARTUP_RUNS: int = 5
+REPEATS: int = 5 # per suite case, median is reported
+REGRESSION_THRESHOLD: float = 0.2 # relative slowdown reported as regression
+REGRESSION_FLOOR: float = 0.002 # s, smaller differences are noise
+CHAIN_LENGTHS: tuple[int, ...] = (10, 100, 500)
+SHEET_SIZE: int = 100 # of each kind of equation
+PLOT_SAMPLES: tuple[int, ...] = (1_000, 100_000, 1_000_000)
+FIELD_SIZES: tuple[int, ...] = (250, 1000, 2000)
+ITEM_COUNTS: tuple[int, ...] = (100, 1000)
+
+# Runs in a fresh interpreter so nothing is imported yet
+COLD_START_SCRIPT: str = r'''
+import time
+t0 = time.perf_counter()
+import json, sys
+from PySide6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from yamcgui.Mainwindow import MainWindow
+from yamcgui.EvalWorker import getEvalExecutor
+window = MainWindow()
+window.show()
+getEvalExecutor().submitWarmUp()
+app.processEvents()
+shown = time.perf_counter() - t0
+from yamcgui.ExpressionItem import ExpressionItem
+item = ExpressionItem(0, 0) # what the first keystroke does
+window.scene.addItem(item)
+item.beginEdit('1')
+app.processEvents()
+typing = time.perf_counter() - t0
+getEvalExecutor().waitForDone()
+warm = time.perf_counter() - t0
+print(json.dumps({'shown': shown, 'typing': typing, 'warm': warm}))
+'''
+
+# Suite runs in its own interpreter too, caches of the calling process don't help it
+SUITE_SCRIPT: str = r'''
+import json, sys
+from PySide6.QtWidgets import QApplication
+app = QApplication(sys.argv[:1])
+import bench
+print(json.dumps(bench.runSuite(int(sys.argv[1]), sys.argv[2:])))
+'''
+
+# Case = (name, setup, run); run(setup()) is timed, setup isn't
+Case = tuple[str, Callable[[], object], Callable[[object], object]]
+
+def runScript(script: str, *args: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', script, *args], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    result['process'] = time.perf_counter() - start
+    return result
+
+def benchColdStart(runs: int = STARTUP_RUNS) -> dict:
+    '''Median seconds until window is shown, accepts typing, SymPy is warm
+    and the whole process exits'''
+    samples = [runScript(COLD_START_SCRIPT) for _ in range(runs)]
+    return {key: median(s[key] for s in samples) for key in samples[0]}
+
+def timeCase(setup: Callable[[], object], run: Callable[[object], object], repeats: int = REPEATS) -> float:
+    '''Median seconds of run, each repeat gets fresh state from setup. One untimed
+    run comes first so imports and first use caches aren't measured, benchColdStart covers them'''
+    run(setup())
+    samples = []
+    for _ in range(repeats):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        samples.append(time.perf_counter() - start)
+    return median(samples)
+
+def solverCases() -> list[Case]:
+    '''Chains of dependent assignments evaluated from scratch and after editing
+    their head, and recomputation of a whole mixed sheet'''
+    from yamcsolve.SymPySolver import SymPySolver
+
+    def chain(n: int) -> SymPySolver:
+        solver = SymPySolver(sandboxed=False)
+        solver.addEquation(0, 'a0:=1')
+        for i in range(1, n):
+            solver.addEquation(i, f'a{i}:=a{i - 1}+1')
+        return solver
+
+    def evaluated(n: int) -> SymPySolver:
+        solver = chain(n)
+        solver.recomputeAll()
+        return solver
+
+    def edit(solver: SymPySolver) -> None:
+        solver.addEquation(0, 'a0:=2')
+        solver.recompute(0)
+
+    def sheet() -> SymPySolver:
+        solver = SymPySolver(sandboxed=False)
+        for i in range(SHEET_SIZE):
+            solver.addEquation(4 * i, f'c{i}:={i}+1')
+            solver.addEquation(4 * i + 1, f'c{i}*x**2+sin(x)*c{i}')
+            solver.addEquation(4 * i + 2, f'c{i}*x+1 = 5')
+            solver.addEquation(4 * i + 3, f'diff(c{i}*x**3, x)')
+        return solver
+
+    cases: list[Case] = []
+    for n in CHAIN_LENGTHS:
+        cases.append((f'solver.chain.{n}', lambda n=n: chain(n), lambda s: s.recomputeAll())) # type: ignore
+        cases.append((f'solver.edit.{n}', lambda n=n: evaluated(n), edit)) # type: ignore
+    cases.append((f'solver.sheet.{4 * SHEET_SIZE}', sheet, lambda s: s.recomputeAll())) # type: ignore
+    return cases
+
+def plotCases() -> list[Case]:
+    '''Sampling of one and two argument results, decimation of a curve and
+    coloring of a heat map'''
+    import numpy as np
+    from sympy import cos, sin, symbols
+    from yamcsolve.PlotData import PlotData
+    from yamcgui.CurveItem import decimateMinMax, PLOT_SIZE
+    from yamcgui.FieldItem import FieldItem
+    x, y = symbols('x y')
+
+    def curve(n: int) -> PlotData:
+        plotData = PlotData(sin(x) / x + x**2 / 100)
+        plotData.getFunction()
+        plotData.setRange(-100.0, 100.0, n)
+        return plotData
+
+    def samples(n: int) -> tuple:
+        xs = np.linspace(-100.0, 100.0, n)
+        return xs, np.sin(xs) * xs
+
+    def field(n: int) -> tuple:
+        plotData = PlotData(sin(x) * cos(y) + x / 10)
+        plotData.setRange(-10.0, 10.0, n)
+        return FieldItem(), plotData.getSurfaceEvaluator()
+
+    def paintField(state: tuple) -> None:
+        item, evaluator = state
+        item.setEvaluator(evaluator)
+        evaluator.evaluate(lambda tile: item.onTile(evaluator, tile))
+        item.onTile(evaluator, None)
+
+    cases: list[Case] = []
+    for n in PLOT_SAMPLES:
+        cases.append((f'plot.sample.{n}', lambda n=n: curve(n), lambda p: p.evaluate())) # type: ignore
+        cases.append((f'plot.decimate.{n}', lambda n=n: samples(n), # type: ignore
+                      lambda s: decimateMinMax(*s, -100.0, 100.0, int(PLOT_SIZE[0]))))
+    for n in FIELD_SIZES:
+        cases.append((f'plot.field.{n}', lambda n=n: field(n), paintField)) # type: ignore
+    return cases
+
+def latexCases() -> list[Case]:
+    '''What the layout thread does for a result: LaTeX conversion and glyph path,
+    of a short formula and of a result spanning thousands of pixels'''
+    from sympy import expand, symbols
+    from yamcgui.ExpressionItem import LATEX_FONT
+    from yamcgui.LatexLayout import latex_text, text_path
+    x, y, z = symbols('x y z')
+    values = {'small': x**2 + 1, 'huge': expand((x + y + z)**8)}
+    return [(f'latex.layout.{name}', lambda value=value: value, # type: ignore
+             lambda v: text_path(latex_text(v), *LATEX_FONT, False)) for name, value in values.items()]
+
+def itemCases() -> list[Case]:
+    '''Items created with text, added to a scene and painted once'''
+    from PySide6.QtCore import Qt
+    from PySide6.QtGui import QImage, QPainter
+    from PySide6.QtWidgets import QGraphicsScene
+    from yamcgui.ExpressionItem import ExpressionItem, ITEM_HEIGHT
+
+    def insert(n: int) -> None:
+        scene = QGraphicsScene()
+        for i in range(n):
+            item = ExpressionItem(0, i * ITEM_HEIGHT)
+            item.loadStream(f'a{i}:={i}*x+1')
+            scene.addItem(item)
+        image = QImage(800, 600, QImage.Format.Format_ARGB32_Premultiplied)
+        image.fill(Qt.GlobalColor.white)
+        painter = QPainter(image)
+        scene.render(painter)
+        painter.end()
+        for item in scene.items():
+            ExpressionItem.instances.pop(getattr(item, 'getId', lambda: None)(), None) # type: ignore
+        scene.clear()
+
+    return [(f'items.insert.{n}', lambda n=n: n, insert) for n in ITEM_COUNTS] # type: ignore
+
+def runSuite(repeats: int = REPEATS, patterns: list[str] | None = None) -> dict[str, float]:
+    '''Median seconds of every case whose name contains one of patterns, all when none given'''
+    results: dict[str, float] = {}
+    for getCases in (solverCases, plotCases, latexCases, itemCases):
+        for name, setup, run in getCases():
+            if not patterns or any(p in name for p in patterns):
+                results[name] = timeCase(setup, run, repeats)
+    return results
+
+def benchSuite(repeats: int = REPEATS, patterns: list[str] | None = None) -> dict[str, float]:
+    return runScript(SUITE_SCRIPT, str(repeats), *(patterns or []))
+
+def compareResults(baseline: dict[str, float], results: dict[str, float],
+                   threshold: float = REGRESSION_THRESHOLD) -> list[str]:
+    '''Cases slower than baseline by more than threshold and REGRESSION_FLOOR'''
+    regressions = []
+    for name, value in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        if value > old * (1 + threshold) and value - old > REGRESSION_FLOOR:
+            regressions.append(f'{name}: {old * 1000:.1f} ms -> {value * 1000:.1f} ms (+{(value / old - 1) * 100:.0f}%)')
+    return regressions
+
+def getCommit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description='yamc benchmarks, exit code 1 on regression')
+    parser.add_argument('cases', nargs='*', help='run only cases whose name contains one of these')
+    parser.add_argument('--runs', type=int, default=STARTUP_RUNS, help='cold starts, 0 skips them')
+    parser.add_argument('--repeats', type=int, default=REPEATS, help='timed runs of each suite case')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET,
+                        help='seconds allowed until window accepts typing')
+    parser.add_argument('--save', metavar='FILE', help='write results as JSON')
+    parser.add_argument('--compare', metavar='FILE', help='JSON written by --save of an earlier commit')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='relative slowdown against --compare reported as regression')
+    args = parser.parse_args(argv)
+    failed = False
+    results: dict[str, float] = {}
+    if args.runs > 0:
+        coldStart = benchColdStart(args.runs)
+        for key, value in coldStart.items():
+            results[f'start.{key}'] = value
+        if coldStart['typing'] > args.startup_budget:
+            print(f'REGRESSION: typing after {coldStart["typing"]:.3f} s, budget {args.startup_budget:.3f} s')
+            failed = True
+    suite = benchSuite(args.repeats, args.cases)
+    suite.pop('process', None)
+    results.update(suite)
+    for name, value in results.items():
+        print(f'{name:24} {value * 1000:10.2f} ms')
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'commit': getCommit(), 'python': platform.python_version(),
+                       'results': results}, file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        regressions = compareResults(baseline['results'], results, args.threshold)
+        for line in regressions:
+            print(f'REGRESSION against {baseline.get("commit") or args.compare}: {line}')
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
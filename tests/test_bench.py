@@ -0,0 +1,12 @@
+import os
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from PySide6.QtWidgets import QApplication
+import bench
+
+
+app = QApplication.instance() or QApplication([])
+
+def testItemsSuite():
+    results = bench.runSuite(1, ['items'])
+    assert sorted(results) == sorted(f'items.insert.{n}' for n in bench.ITEM_COUNTS)
+    assert all(seconds > 0 for seconds in results.values())
@@ -0,0 +1,28 @@
+from yamcsolve.SymPySolver import SymPySolver
+
+
+# Symbolic solve of the last one outlasts SOLVE_BUDGET, its root is found numerically
+SHEET: list[str] = [
+    'a:=2',
+    'b:=a+1',
+    'x**2 - a = b',
+    'diff(sin(x)*b, x)',
+    'x**(1/5) + x**(1/3) = 3',
+]
+
+def evaluate(workers: int) -> list[str]:
+    solver = SymPySolver()
+    solver.setParallel(workers)
+    try:
+        for id, stream in enumerate(SHEET):
+            solver.addEquation(id, stream)
+        solver.recomputeAll()
+        return [solver.getEquation(id).getResultStream() for id in range(len(SHEET))]
+    finally:
+        solver.setParallel(1)
+
+def testParallelMatchesSerial():
+    serial = evaluate(1)
+    assert not any(r.startswith('Error') for r in serial)
+    assert 'CRootOf' not in serial[-1]
+    assert evaluate(2) == serial
@@ -0,0 +1,17 @@
+from yamcsolve.PlotData import DEFAULT_RANGE
+from yamcsolve.SymPySolver import SymPySolver
+
+
+def testPlotRangeFromParams():
+    solver = SymPySolver(sandboxed=False)
+    solver.addEquation(0, 'sin(x) | -5 5 50')
+    solver.addEquation(1, 'x*y | 0 2')
+    solver.addEquation(2, 'cos(x)')
+    solver.recomputeAll()
+    assert solver.getPlotData(0).getRange() == (-5.0, 5.0, 50)
+    assert solver.getPlotData(1).getRange2() == (0.0, 2.0, DEFAULT_RANGE[2])
+    assert solver.getPlotData(2).getRange() == DEFAULT_RANGE
+
+    solver.addEquation(0, 'sin(x) | 1 3 20')
+    solver.recompute(0)
+    assert solver.getPlotData(0).getRange() == (1.0, 3.0, 20)
@@ -0,0 +1,33 @@
+import os
+import sys
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+import pytest
+from PySide6.QtCore import QPointF, QRectF
+from PySide6.QtGui import QImage, QPainter, QPainterPath, QStaticText
+from PySide6.QtWidgets import QApplication
+
+
+# PySide6 6.12.0 drops a reference to None on each of these, on Python before
+# 3.12 (None isn't immortal there) that ends in "none_dealloc" abort
+CALLS: int = 1000
+app = QApplication.instance() or QApplication([])
+
+@pytest.mark.skipif(sys.version_info >= (3, 12), reason='None is immortal')
+def testVoidCallsKeepNone():
+    image = QImage(16, 16, QImage.Format.Format_ARGB32_Premultiplied)
+    path = QPainterPath()
+    path.addRect(0, 0, 8, 8)
+    text = QStaticText('x')
+    painter = QPainter(image)
+    calls = {'QStaticText.setText': lambda: text.setText('x'), 'processEvents': app.processEvents,
+             'drawPath': lambda: painter.drawPath(path), 'drawImage': lambda: painter.drawImage(QRectF(0, 0, 8, 8), image),
+             'drawStaticText': lambda: painter.drawStaticText(QPointF(0, 8), text)}
+    try:
+        for name, call in calls.items():
+            call()
+            before = sys.getrefcount(None)
+            for _ in range(CALLS):
+                call()
+            assert sys.getrefcount(None) - before > -CALLS // 2, name
+    finally:
+        painter.end()
@@ -0,0 +1,14 @@
+from yamcsolve.SymPySolver import SymPySolver
+
+
+def testRenameRecomputesOldReaders():
+    solver = SymPySolver(sandboxed=False)
+    for id, stream in enumerate(['a:=2', 'b:=a+1', 'b*2']):
+        solver.addEquation(id, stream)
+    solver.recomputeAll()
+    assert solver.getEquation(2).getResultStream() == '6'
+
+    solver.addEquation(1, 'bb:=a+1')
+    assert 2 in solver.recompute(1)
+    assert solver.getEquation(2).getResultStream() == '2*b'
+    assert not solver.getEquation(2).getRecalculationReq()
@@ -0,0 +1,11 @@
+from yamcsolve.SymPySolver import SymPySolver
+
+
+def testUnitsThroughSolver():
+    solver = SymPySolver(sandboxed=False)
+    for id, stream in enumerate(['F := 3*kilogram*meter/second**2', 'simplifyUnits(F)',
+                                 'convertUnits(5*newton*meter, joule)', 'convertUnits(2*kilometer, meter)']):
+        solver.addEquation(id, stream)
+    solver.recomputeAll()
+    results = [solver.getEquation(id).getResultStream() for id in range(4)]
+    assert results[1:] == ['3*newton', '5*joule', '2000*meter']
@@ -1,9 +1,13 @@
 from PySide6.QtWidgets import QApplication
 from yamcgui.Mainwindow import MainWindow
+from yamcgui.EvalWorker import getEvalExecutor
+from yamcsolve.SandboxPool import getSandboxPool
 import sys
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
+    getEvalExecutor().submitWarmUp() # SymPy loads on evaluation thread, typing works meanwhile
+    getSandboxPool() # start workers importing SymPy while window opens
     sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,5 @@
+from yamcsolve.Batch import main
+import sys
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,126 @@
+from PySide6.QtWidgets import (QAbstractItemView, QFileDialog, QFrame, QHBoxLayout, QHeaderView, QLabel, QPushButton,
+                               QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget)
+from PySide6.QtGui import QColor
+from PySide6.QtCore import Qt, QTimer, Signal
+from yamcsolve.ActiveSolvers import ActiveEquations
+from yamcsolve.EqTimings import STAGES, timingsReport, writeTimings
+import math
+
+
+COST_RANGE: tuple[float, float] = (1e-3, 1.0) # s, green up to first, red from second
+REFRESH_INTERVAL: int = 500 # ms, while panel is shown
+MAX_ROWS: int = 200 # slowest equations listed
+PANEL_SIZE: tuple[int, int] = (760, 280)
+EQUATION_WIDTH: int = 220 # of equation column, wider ones are cut
+COLUMNS: tuple[str, ...] = ('Id', 'Equation', 'Total', *(s.capitalize() for s in STAGES), 'Cache')
+
+def getCostColor(seconds: float, alpha: int = 255) -> QColor:
+    '''Green to red on a log scale over COST_RANGE'''
+    low, high = COST_RANGE
+    t = (math.log10(max(seconds, low)) - math.log10(low)) / (math.log10(high) - math.log10(low))
+    return QColor.fromHsvF((1.0 - min(t, 1.0)) / 3, 0.8, 0.95, alpha / 255)
+
+class _ValueItem(QTableWidgetItem):
+    '''Cell sorted by the value it was made from, not its text'''
+    def __init__(self, text: str, value) -> None:
+        super().__init__(text)
+        self._value = value
+
+    def __lt__(self, other: QTableWidgetItem) -> bool:
+        return self._value < getattr(other, '_value', 0)
+
+class CostPanel(QFrame):
+    '''Sortable table of the slowest equations with what each stage of them took,
+    refreshed while shown. Timings can be exported as JSON or as a Chrome trace.'''
+    equationActivated: Signal = Signal(int) # id of double clicked row
+    refreshed: Signal = Signal()
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.setAutoFillBackground(True)
+        self.resize(*PANEL_SIZE)
+
+        self.table: QTableWidget = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setWordWrap(False)
+        self.table.verticalHeader().hide()
+        self.table.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 6)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Interactive)
+        header.resizeSection(1, EQUATION_WIDTH)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(2, Qt.SortOrder.DescendingOrder)
+        self.table.cellDoubleClicked.connect(self._onDoubleClicked)
+
+        self.summary: QLabel = QLabel()
+        jsonButton = QPushButton('Export JSON…')
+        jsonButton.clicked.connect(lambda: self._export(False))
+        traceButton = QPushButton('Export Trace…')
+        traceButton.clicked.connect(lambda: self._export(True))
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.summary, 1)
+        buttons.addWidget(jsonButton)
+        buttons.addWidget(traceButton)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        layout.addWidget(QLabel('Slowest equations (ms)'))
+        layout.addWidget(self.table)
+        layout.addLayout(buttons)
+
+        self._timer: QTimer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL)
+        self._timer.timeout.connect(self.refresh)
+
+    # Public
+    def refresh(self) -> None:
+        report = timingsReport(list(ActiveEquations.items()))
+        total = sum(entry['total'] for entry in report)
+        hits = sum(1 for entry in report if entry['cacheHit'])
+        misses = sum(1 for entry in report if entry['cacheHit'] is False)
+        self.summary.setText(f'{len(report)} equations, {total * 1000:.1f} ms, cache {hits} hit / {misses} miss')
+        report = report[:MAX_ROWS]
+        table = self.table
+        table.setSortingEnabled(False)
+        table.setRowCount(len(report))
+        for row, entry in enumerate(report):
+            cacheHit = entry['cacheHit']
+            cells = [_ValueItem(str(entry['id']), entry['id']), _ValueItem(entry['stream'], entry['stream'])]
+            cells += [_ValueItem(f'{entry[key] * 1000:.1f}', entry[key]) for key in ('total', *STAGES)]
+            cells.append(_ValueItem('' if cacheHit is None else 'hit' if cacheHit else 'miss', -1 if cacheHit is None else cacheHit))
+            cells[2].setBackground(getCostColor(entry['total'], 120))
+            for column, cell in enumerate(cells):
+                if column != 1:
+                    cell.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(row, column, cell)
+        table.setSortingEnabled(True)
+        self.refreshed.emit()
+
+    def exportTimings(self, path: str, trace: bool = False) -> None:
+        writeTimings(path, list(ActiveEquations.items()), trace)
+
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event) -> None:
+        super().hideEvent(event)
+        self._timer.stop()
+
+    # Internal
+    def _onDoubleClicked(self, row: int, column: int) -> None:
+        self.equationActivated.emit(int(self.table.item(row, 0).text()))
+
+    def _export(self, trace: bool) -> None:
+        filePath, _ = QFileDialog.getSaveFileName(
+            parent=None,
+            caption="Export Trace" if trace else "Export Timings",
+            dir="",
+            filter="JSON Files (*.json);;All Files (*)"
+        )
+        if filePath:
+            self.exportTimings(filePath, trace)
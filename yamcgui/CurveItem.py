@@ -0,0 +1,203 @@
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsRectItem, QGraphicsSceneMouseEvent, QGraphicsSceneWheelEvent, QStyleOptionGraphicsItem, QWidget
+from PySide6.QtGui import QBrush, QColor, QPainter, QPainterPath, QPen, Qt
+from PySide6.QtCore import QPointF
+from yamcgui.LatexLayout import qt_path
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy as np
+
+
+PLOT_SIZE: tuple[float, float] = (320.0, 200.0)
+ZOOM_STEP: float = 1.25 # per wheel notch
+FIT_PERCENTILES: tuple[float, float] = (1.0, 99.0) # y window ignores spikes at poles
+FIT_MARGIN: float = 0.05
+CLIP_EXTENT: float = 8.0 # heights of plot, vertices beyond are clamped for Qt
+
+# matplotlib.path.Path codes understood by qt_path, STOP points are dropped
+_STOP, _MOVETO, _LINETO = 0, 1, 2
+
+def decimateMinMax(x: 'np.ndarray', y: 'np.ndarray', x0: float, x1: float, columns: int) -> tuple['np.ndarray', 'np.ndarray']:
+    '''Reduces samples with ascending x to what is visible in [x0, x1] at most two
+    per pixel column: the column's minimum and maximum, ordered as the curve passes
+    them. Runs of NaN stay as one NaN so gaps at poles survive. One sample left and
+    right of the window is kept so lines leave the plot edge.'''
+    import numpy as np
+    i0 = max(0, int(np.searchsorted(x, x0, 'left')) - 1)
+    i1 = min(x.size, int(np.searchsorted(x, x1, 'right')) + 1)
+    x, y = x[i0:i1], y[i0:i1]
+    if x.size <= 2 * columns or x1 <= x0:
+        return x, y
+    col = np.floor((x - x0) * (columns / (x1 - x0))).astype(np.int64)
+    nan = np.isnan(y)
+    change = np.flatnonzero((col[1:] != col[:-1]) | (nan[1:] != nan[:-1])) + 1
+    starts = np.concatenate(([0], change))
+    ends = np.concatenate((change, [x.size])) - 1
+    low = np.minimum.reduceat(y, starts)
+    high = np.maximum.reduceat(y, starts)
+    rising = y[starts] <= y[ends]
+    xs = np.empty(2 * starts.size)
+    ys = np.empty(2 * starts.size)
+    xs[0::2] = x[starts]
+    xs[1::2] = x[ends]
+    ys[0::2] = np.where(rising, low, high)
+    ys[1::2] = np.where(rising, high, low)
+    return xs, ys
+
+class CurveItem(QGraphicsRectItem):
+    '''Line plot of a sampled one argument result, painted with QPainter. Samples
+    are kept and decimated to the pixel columns of the current window, so pan
+    (drag) and zoom (wheel) don't evaluate the function again. Double click
+    fits the window to the samples.'''
+    def __init__(self, parent: QGraphicsItem | None = None) -> None:
+        super().__init__(0, 0, *PLOT_SIZE, parent)
+        self.setPen(QPen(QColor('#999999')))
+        self.setBrush(QBrush(QColor(255, 255, 255, 220)))
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        self.setAcceptedMouseButtons(Qt.MouseButton.LeftButton)
+        self._x: 'np.ndarray | None' = None
+        self._y: 'np.ndarray | None' = None
+        self._window: tuple[float, float, float, float] = (-1.0, 1.0, -1.0, 1.0)
+        self._path: QPainterPath = QPainterPath()
+        self._pathKey: tuple | None = None
+        self._pointCount: int = 0
+        self._dragPos: QPointF | None = None
+
+    # Public
+    def setSamples(self, x: 'np.ndarray', y: 'np.ndarray') -> None:
+        self._x, self._y = x, y
+        self.fitWindow()
+
+    def clearSamples(self) -> None:
+        self._x = self._y = None
+        self._pathKey = None
+        self._path = QPainterPath()
+        self.update()
+
+    def hasSamples(self) -> bool:
+        return self._x is not None and self._x.size > 0
+
+    def getWindow(self) -> tuple[float, float, float, float]:
+        '''Visible (x0, x1, y0, y1) in data units'''
+        return self._window
+
+    def setWindow(self, x0: float, x1: float, y0: float, y1: float) -> None:
+        if x1 > x0 and y1 > y0 and (x0, x1, y0, y1) != self._window:
+            self._window = (x0, x1, y0, y1)
+            self.update()
+
+    def fitWindow(self) -> None:
+        '''Window over all samples, y range without outliers'''
+        if not self.hasSamples():
+            return
+        import numpy as np
+        x, y = self._x, self._y
+        finite = y[np.isfinite(y)] # type: ignore
+        if finite.size:
+            y0, y1 = (float(v) for v in np.percentile(finite, FIT_PERCENTILES))
+        else:
+            y0 = y1 = 0.0
+        if y1 <= y0:
+            y0, y1 = y0 - 1.0, y1 + 1.0
+        pad = (y1 - y0) * FIT_MARGIN
+        x0, x1 = float(x[0]), float(x[-1]) # type: ignore
+        if x1 <= x0:
+            x0, x1 = x0 - 1.0, x1 + 1.0
+        self._window = (x0, x1, y0 - pad, y1 + pad)
+        self.update()
+
+    def pan(self, dx: float, dy: float) -> None:
+        '''Moves content by dx, dy item pixels'''
+        x0, x1, y0, y1 = self._window
+        rect = self.rect()
+        sx = (x1 - x0) / rect.width()
+        sy = (y1 - y0) / rect.height()
+        self.setWindow(x0 - dx * sx, x1 - dx * sx, y0 + dy * sy, y1 + dy * sy)
+
+    def zoom(self, factor: float, anchor: QPointF) -> None:
+        '''Scales window by factor around item point anchor, factor < 1 zooms in'''
+        x0, x1, y0, y1 = self._window
+        ax, ay = self._toData(anchor)
+        self.setWindow(ax + (x0 - ax) * factor, ax + (x1 - ax) * factor,
+                       ay + (y0 - ay) * factor, ay + (y1 - ay) * factor)
+
+    def getPointCount(self) -> int:
+        '''Vertices drawn at last paint, after decimation'''
+        return self._pointCount
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = None) -> None:
+        super().paint(painter, option, widget)
+        if not self.hasSamples():
+            return
+        rect = self.rect()
+        scale = option.levelOfDetailFromTransform(painter.worldTransform()) # type: ignore
+        columns = max(1, int(rect.width() * scale))
+        key = (self._window, columns, rect)
+        if key != self._pathKey:
+            self._path = self._buildPath(columns)
+            self._pathKey = key
+        painter.save()
+        painter.setClipRect(rect)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        self._paintAxes(painter)
+        painter.setPen(QPen(QColor('#1f77b4'), 1.2))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawPath(self._path)
+        painter.restore()
+
+    def wheelEvent(self, event: QGraphicsSceneWheelEvent) -> None:
+        self.zoom(ZOOM_STEP ** (-event.delta() / 120), event.pos())
+        event.accept()
+
+    def mousePressEvent(self, event: QGraphicsSceneMouseEvent) -> None:
+        self._dragPos = event.pos()
+        event.accept()
+
+    def mouseMoveEvent(self, event: QGraphicsSceneMouseEvent) -> None:
+        if self._dragPos is not None:
+            delta = event.pos() - self._dragPos
+            self._dragPos = event.pos()
+            self.pan(delta.x(), delta.y())
+        event.accept()
+
+    def mouseReleaseEvent(self, event: QGraphicsSceneMouseEvent) -> None:
+        self._dragPos = None
+        event.accept()
+
+    def mouseDoubleClickEvent(self, event: QGraphicsSceneMouseEvent) -> None:
+        self.fitWindow()
+        event.accept()
+
+    # Internal
+    def _toData(self, point: QPointF) -> tuple[float, float]:
+        x0, x1, y0, y1 = self._window
+        rect = self.rect()
+        return (x0 + (point.x() - rect.left()) / rect.width() * (x1 - x0),
+                y0 + (rect.bottom() - point.y()) / rect.height() * (y1 - y0))
+
+    def _buildPath(self, columns: int) -> QPainterPath:
+        '''Decimated samples in item coordinates, NaN breaks the line'''
+        import numpy as np
+        x0, x1, y0, y1 = self._window
+        xs, ys = decimateMinMax(self._x, self._y, x0, x1, columns) # type: ignore
+        rect = self.rect()
+        # Y-up vertices, qt_path flips them to rect's Y-down coordinates
+        px = rect.left() + (xs - x0) * (rect.width() / (x1 - x0))
+        with np.errstate(invalid='ignore'):
+            py = np.clip((ys - y0) * (rect.height() / (y1 - y0)), -CLIP_EXTENT * rect.height(),
+                         (CLIP_EXTENT + 1) * rect.height()) - rect.bottom()
+        finite = np.isfinite(py)
+        codes = np.where(finite, _LINETO, _STOP)
+        codes[finite & ~np.concatenate(([False], finite[:-1]))] = _MOVETO
+        self._pointCount = int(finite.sum())
+        return qt_path(np.column_stack((px, np.where(finite, py, 0.0))), codes)
+
+    def _paintAxes(self, painter: QPainter) -> None:
+        x0, x1, y0, y1 = self._window
+        rect = self.rect()
+        painter.setPen(QPen(QColor('#cccccc'), 0))
+        if x0 < 0 < x1:
+            x = rect.left() - x0 / (x1 - x0) * rect.width()
+            painter.drawLine(QPointF(x, rect.top()), QPointF(x, rect.bottom()))
+        if y0 < 0 < y1:
+            y = rect.bottom() + y0 / (y1 - y0) * rect.height()
+            painter.drawLine(QPointF(rect.left(), y), QPointF(rect.right(), y))
@@ -0,0 +1,183 @@
+from typing import Callable
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+from yamcsolve.ActiveSolvers import getActiveSolver, warmUp
+from yamcsolve.Worksheet import restoreWorksheet, writeWorksheet
+
+
+CURVE_BUDGET: int = 20_000 # adaptive samples of one argument results, decimated per pixel column when drawn
+CURVE_INITIAL: int = 2049 # uniform samples refinement starts from, oscillation finer than these is missed
+FIELD_SAMPLES: int = 1000 # per axis of two argument results
+
+
+class EvalSignals(QObject):
+    finished: Signal = Signal(int, int, object) # id, generation, {id: (result text, result)} in evaluation order
+
+
+class EvalJob(QRunnable):
+    '''Runs one solver call on the evaluation thread'''
+    def __init__(self, executor: 'EvalExecutor', id: int, generation: int, job: Callable[[], list[int]]) -> None:
+        super().__init__()
+        self._executor: EvalExecutor = executor
+        self._signals: EvalSignals = executor.getSignals()
+        self._id: int = id
+        self._generation: int = generation
+        self._job: Callable[[], list[int]] = job
+
+    def run(self) -> None:
+        results: dict[int, tuple[str, object]] = {}
+        if self._executor.isCurrent(self._id, self._generation):
+            try:
+                ids = self._job()
+                # Rendered here, str of a large result would stall typing on the GUI thread
+                solver = getActiveSolver()
+                for i in ids:
+                    eq = solver.getEquation(i)
+                    results[i] = (eq.getResultStream(), eq.getResult())
+            except Exception as e:
+                print(f'EvalJob failed due to: {e}')
+        self._signals.finished.emit(self._id, self._generation, results)
+
+
+class EvalExecutor(QObject):
+    '''Evaluates equations off the GUI thread. Solver is not thread safe so every
+    call touching it runs on a single worker thread, in submission order.
+    Jobs are tagged with a per-item generation; jobs for text that was already
+    changed again are skipped and their results reported as stale.
+    Result of every evaluated equation is kept for the GUI together with its
+    text, so it never reads results the evaluation thread may be replacing.'''
+    resultsReady: Signal = Signal(int, int, list) # id, generation, ids evaluated in order
+    curveReady: Signal = Signal(int, object) # id, (x, y) sample arrays or None
+    fieldReady: Signal = Signal(int, object, object) # id, SurfaceEvaluator, finished tile or None
+    ALL_ITEMS: int = -1
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._pool: QThreadPool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals: EvalSignals = EvalSignals()
+        self._signals.finished.connect(self._onFinished)
+        self._generations: dict[int, int] = {}
+        self._pending: dict[int, int] = {}
+        self._results: dict[int, tuple[str, object]] = {} # id: (text, result)
+
+    # Public
+    def submit(self, id: int, generation: int, stream: str) -> None:
+        '''Evaluates stream as equation id and everything downstream of it'''
+        def job() -> list[int]:
+            solver = getActiveSolver()
+            solver.addEquation(id, stream)
+            return solver.recompute(id)
+        self._generations[id] = generation
+        self._start(id, generation, job)
+
+    def submitAll(self, streams: dict[int, str]) -> None:
+        '''Passes streams to solver and recomputes everything flagged'''
+        def job() -> list[int]:
+            solver = getActiveSolver()
+            for id, stream in streams.items():
+                solver.addEquation(id, stream)
+            return solver.recomputeAll()
+        self._start(self.ALL_ITEMS, self.ALL_ITEMS, job)
+
+    def submitPop(self, id: int) -> None:
+        '''Removes equation and recomputes what depended on it'''
+        def job() -> list[int]:
+            solver = getActiveSolver()
+            solver.popEquation(id)
+            return solver.recomputeAll()
+        self._generations.pop(id, None)
+        self._results.pop(id, None)
+        self._start(self.ALL_ITEMS, self.ALL_ITEMS, job)
+
+    def submitWarmUp(self) -> None:
+        '''Loads SymPy on the evaluation thread while GUI is already usable'''
+        def job() -> list[int]:
+            warmUp()
+            return []
+        self._start(self.ALL_ITEMS, self.ALL_ITEMS, job)
+
+    def submitSave(self, path: str, items: dict[int, tuple[str, tuple[float, float]]]) -> None:
+        '''Writes worksheet of items {id: (stream, pos)}. Edits not evaluated
+        yet are saved without result and get computed on open'''
+        def job() -> list[int]:
+            solver = getActiveSolver()
+            for id, (stream, _) in items.items():
+                solver.addEquation(id, stream)
+            writeWorksheet(path, solver, {id: pos for id, (_, pos) in items.items()})
+            return []
+        self._start(self.ALL_ITEMS, self.ALL_ITEMS, job)
+
+    def submitRestore(self, records: list[dict], ids: list[int]) -> None:
+        '''Adds worksheet records under ids, reusing stored results where valid'''
+        def job() -> list[int]:
+            return restoreWorksheet(getActiveSolver(), records, ids)
+        self._start(self.ALL_ITEMS, self.ALL_ITEMS, job)
+
+    def submitPlot(self, id: int, budget: int = CURVE_BUDGET, fieldSamples: int = FIELD_SAMPLES) -> None:
+        '''Samples result of equation id over its plot ranges. One argument results are
+        sampled adaptively, densest where they bend, with poles cut by NaN, and arrive
+        through curveReady as about budget samples. Two argument results arrive through
+        fieldReady once per SurfaceEvaluator tile and with None when done.
+        Anything else gets curveReady with None.'''
+        def job() -> list[int]:
+            solver = getActiveSolver()
+            # Emits are queued, drawing on the GUI thread is not part of the plot time
+            with solver.getEquation(id).getTimings().measure('plot'):
+                plotData = solver.getPlotData(id)
+                if plotData is None:
+                    self.curveReady.emit(id, None)
+                elif plotData.getDims() == 1:
+                    start, stop, _ = plotData.getRange()
+                    self.curveReady.emit(id, plotData.sampleAdaptive(start, stop, budget, CURVE_INITIAL))
+                else:
+                    start, stop, n = plotData.getRange()
+                    plotData.setRange(start, stop, max(n, fieldSamples))
+                    start, stop, n = plotData.getRange2()
+                    plotData.setRange2(start, stop, max(n, fieldSamples))
+                    evaluator = plotData.getSurfaceEvaluator()
+                    evaluator.evaluate(lambda tile: self.fieldReady.emit(id, evaluator, tile))
+                    self.fieldReady.emit(id, evaluator, None)
+            return []
+        self._start(self.ALL_ITEMS, self.ALL_ITEMS, job)
+
+    def isCurrent(self, id: int, generation: int) -> bool:
+        return id == self.ALL_ITEMS or self._generations.get(id) == generation
+
+    def getResultText(self, id: int) -> str:
+        '''Result of equation id as text, rendered when it was evaluated'''
+        return self._results.get(id, ('', None))[0]
+
+    def getResult(self, id: int):
+        '''Result of equation id as it was when its text was rendered, None before evaluation'''
+        return self._results.get(id, ('', None))[1]
+
+    def isPending(self, id: int) -> bool:
+        return self._pending.get(id, 0) > 0
+
+    def getSignals(self) -> EvalSignals:
+        return self._signals
+
+    def waitForDone(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    # Internal
+    def _start(self, id: int, generation: int, job: Callable[[], list[int]]) -> None:
+        self._pending[id] = self._pending.get(id, 0) + 1
+        self._pool.start(EvalJob(self, id, generation, job))
+
+    @Slot(int, int, object)
+    def _onFinished(self, id: int, generation: int, results: dict[int, tuple[str, object]]) -> None:
+        self._pending[id] -= 1
+        if not self._pending[id]:
+            self._pending.pop(id)
+        self._results.update(results)
+        self.resultsReady.emit(id, generation, list(results))
+
+
+_executor: EvalExecutor | None = None
+
+def getEvalExecutor() -> EvalExecutor:
+    global _executor
+    if _executor is None:
+        _executor = EvalExecutor()
+    return _executor
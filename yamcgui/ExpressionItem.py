@@ -1,88 +1,164 @@
-from PySide6.QtWidgets import QGraphicsItem, QGraphicsRectItem, QGraphicsProxyWidget, QGraphicsSceneContextMenuEvent
-from PySide6.QtGui import QBrush, QColor, QFontMetrics, QAction, Qt
-from PySide6.QtCore import QTimer
-#from matplotlib import cm
-from yamcgui.LatexWidget import LatexWidget
-#from yamcgui.PlotWidget import PlotWidget
-from yamcgui.QGraphicsTextLabel import QGraphicsTextLabel
-from yamcgui.AutoResizeLineEdit import AutoResizeLineEdit
+from PySide6.QtWidgets import (QApplication, QGraphicsItem, QGraphicsRectItem, QGraphicsSceneContextMenuEvent,
+                               QGraphicsSceneMouseEvent, QMenu, QStyleOptionGraphicsItem, QWidget)
+from PySide6.QtGui import QAction, QBrush, QColor, QFont, QFontMetricsF, QImage, QPainter, QPainterPath, Qt
+from PySide6.QtCore import QPoint, QPointF, QRectF, QTimer
+from yamcgui.LatexLayout import get_layouter, path_image
+from yamcgui.CostPanel import getCostColor
+from yamcgui.CurveItem import CurveItem
+from yamcgui.FieldItem import FieldItem
+from yamcgui.ItemEditor import EDITOR_POS, getEditedItem, getItemEditor
+from yamcgui.EvalWorker import getEvalExecutor
 from yamcsolve.Equation import VisType
-from yamcsolve.SymPySolver import Equation
-from yamcsolve.ActiveSolvers import ActiveSolver
+from yamcsolve.Equation import Equation
+from yamcsolve.ActiveSolvers import ActiveEquations, getActiveEquation
+import time
 
 
+ITEM_HEIGHT: float = 30
+TEXT_MARGIN: float = 2 # line edit draws its text this far from its left edge
+RESULT_GAP: float = 12 # from end of input text to result
+LATEX_FONT: tuple[str, float] = ("DejaVu Serif", 10.0)
+LATEX_SCALE: float = 96 / 72 # points to pixels at nominal DPI
+LATEX_COLOR: QColor = QColor("#222222")
+COST_ALPHA: int = 90 # of cost overlay fill
+
 class ExpressionItem(QGraphicsRectItem):
+    '''Canvas item of one equation. Input and result are painted, the shared
+    ItemEditor line edit is placed over the item only while it is edited.'''
     instances: dict[int, 'ExpressionItem'] = {}
-    def __init__(self, x: float, y: float) -> None:
-        super().__init__(0, 0, 220, 30)
+    costOverlay: bool = False # items filled with color of their cost, see CostPanel
+    _executorConnected: bool = False
+    def __init__(self, x: float, y: float, id: int | None = None) -> None:
+        '''id of an equation already in solver (worksheet item built when scrolled into view)
+        or None to reserve a new one'''
+        super().__init__(0, 0, 220, ITEM_HEIGHT)
         self.setPos(x, y)
-        self._id: int = ActiveSolver.getFreeId()
-        self._equation: Equation = ActiveSolver.getEquation(self.getId())
+        self._id: int = ActiveEquations.reserveId() if id is None else id
+        self._generation: int = 0
         type(self).instances[self.getId()] = self
+        type(self).connectExecutor()
 
         self.setBrush(QBrush(QColor(0, 0, 0, 0)))
         self.setPen(Qt.PenStyle.NoPen)
         self.setFlags(QGraphicsItem.GraphicsItemFlag.ItemIsMovable | QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
-
-        self.inputField = AutoResizeLineEdit('', self)
-        self.inputField.setPlaceholderText("Enter expression")
-        self.inputField.setFrame(False)
-
-        self.resultLabel = QGraphicsTextLabel("", self)
-        self.resultLabel.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
-
-        self.inputFieldProxy = QGraphicsProxyWidget(self)
-        self.inputFieldProxy.setWidget(self.inputField)
-        self.inputFieldProxy.setPos(5, 5)
-
-        self.inputField.returnPressed.connect(self.evaluateExpression)
-        self.inputField.textChanged.connect(self.moveResultLabel)
-
-        self.plot: (QGraphicsProxyWidget | None) = None
-        self.plotProxy = QGraphicsProxyWidget(self)
-        self.plotProxy.setFlags(QGraphicsItem.GraphicsItemFlag.ItemStacksBehindParent)
-
-        self.latex: LatexWidget = LatexWidget()
-        self.latexProxy: QGraphicsProxyWidget = QGraphicsProxyWidget(self)
-        self.latexProxy.hide()
-        self.latex.hide()
-        self.latexProxy.setWidget(self.latex)
+        # Repainted only when text changes, not when scrolled or when selection passes over
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+
+        self._stream: str = ''
+        self._resultText: str = ''
+        self._inputWidth: float = 0.0 # advances of input and result text, measured when they change
+        self._resultWidth: float = 0.0
+        self._resultVisible: bool = True
+        self._latexKey: tuple | None = None
+        self._latexPath: QPainterPath | None = None
+        self._latexBounds: QRectF = QRectF()
+        self._latexImage: QImage | None = None # raster of path at pixel ratio of last paint
+        self._latexStart: float = 0.0 # when layout of _latexKey was requested
+        self._costShown: float = 0.0 # total of timings painted by overlay
+        self._curve: CurveItem | None = None
+        self._field: FieldItem | None = None
 
         self._debounce = QTimer()
         self._debounce.setSingleShot(True)
         self._debounce.setInterval(300)
         self._debounce.timeout.connect(self.evaluateExpression)
 
-        self.inputField.textChanged.connect(self._onTextChanged)
-        self.inputField.unfocused.connect(self.checkBlankItem)
-
     def getId(self) -> int:
         return self._id
-    
+
     def getEquation(self) -> Equation:
-        return self._equation
+        return getActiveEquation(self.getId())
+
+    def isEditing(self) -> bool:
+        return getEditedItem() is self
+
+    def isBusy(self) -> bool:
+        '''Being edited, selected or waiting for evaluation, so must not be released'''
+        return (self.isSelected() or self.isEditing() or self._debounce.isActive()
+                or getEvalExecutor().isPending(self.getId()))
+
+    def release(self) -> None:
+        '''Destroys graphics, equation stays in solver'''
+        if self.isEditing():
+            getItemEditor().detach()
+        type(self).instances.pop(self.getId(), None)
+        self._debounce.stop()
+        self._hidePlots()
+        self.getEquation().setPos((self.pos().x(), self.pos().y()))
+        scene = self.scene()
+        if scene: scene.removeItem(self)
 
-    def _onTextChanged(self) -> None:
-        self._debounce.start()
+    def beginEdit(self, text: str | None = None, cursorPos: int | None = None) -> None:
+        '''Attaches shared editor, text replaces the current one as if typed'''
+        editor = getItemEditor()
+        editor.attach(self)
+        if text is not None:
+            editor.lineEdit.setText(text)
+        editor.lineEdit.setCursorPosition(len(editor.lineEdit.text()) if cursorPos is None else cursorPos)
 
-    def updateLatexSize(self):
-        self.latex.adjustSize()
+    def onEditorAttached(self) -> None:
+        self.update()
 
-    def updateLatexPos(self):
-        h:float = self.latex.size().height()/2
-        self.latexProxy.setPos(self.resultLabel.x(), self.resultLabel.y() - h + 10)
+    def onEditorDetached(self) -> None:
+        self.update()
 
-    def moveResultLabel(self):
-        fm = QFontMetrics(self.inputFieldProxy.font())
-        text_width = fm.horizontalAdvance(self.inputField.text())
-        self.resultLabel.setPos(text_width+8, 2)
-        self.setRect(0, 0, text_width+10, 30)
+    def onEditorTextChanged(self, text: str) -> None:
+        self._setStream(text)
+        self._generation += 1
+        self._debounce.start()
+        self.rearrangeItem()
 
     def rearrangeItem(self):
-        self.moveResultLabel()
+        '''Fits rect around input and result'''
+        width = self._getResultX() + 10
+        height = ITEM_HEIGHT
+        if self._resultVisible:
+            if self._isLatexShown():
+                width += self._latexBounds.width() * LATEX_SCALE
+                height = max(height, self._latexBounds.height() * LATEX_SCALE + 10)
+            else:
+                width += self._resultWidth
+        if self.rect() != QRectF(0, 0, width, height):
+            self.setRect(0, 0, width, height)
+        self.update()
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = None) -> None:
+        super().paint(painter, option, widget)
+        if type(self).costOverlay:
+            self._costShown = self.getEquation().getTimings().getTotal()
+            painter.fillRect(self.rect(), getCostColor(self._costShown, COST_ALPHA))
+        painter.setFont(self.getFont())
+        painter.setPen(QColor("black"))
+        fm = QFontMetricsF(self.getFont())
+        baseline = (ITEM_HEIGHT - fm.height()) / 2 + fm.ascent()
+        if not self.isEditing():
+            painter.drawText(QPointF(EDITOR_POS[0] + TEXT_MARGIN, baseline), self._stream)
+        if not self._resultVisible:
+            return
+        x = self._getResultX()
+        if self._isLatexShown():
+            ratio = painter.device().devicePixelRatioF()
+            if self._latexImage is None or self._latexImage.devicePixelRatio() != ratio:
+                self._latexImage = path_image(self._latexPath, self._latexBounds, LATEX_SCALE, ratio, LATEX_COLOR) # type: ignore
+            y = (self.rect().height() - self._latexBounds.height() * LATEX_SCALE) / 2
+            painter.drawImage(QPointF(x, y), self._latexImage)
+        else:
+            painter.drawText(QPointF(x, baseline), self._resultText)
+
+    def mouseReleaseEvent(self, event: QGraphicsSceneMouseEvent) -> None:
+        super().mouseReleaseEvent(event)
+        moved = (event.scenePos() - event.buttonDownScenePos(Qt.MouseButton.LeftButton)).manhattanLength()
+        if event.button() == Qt.MouseButton.LeftButton and moved < QApplication.startDragDistance():
+            # Click without drag starts editing at clicked character
+            self.beginEdit()
+            lineEdit = getItemEditor().lineEdit
+            pos = event.pos() - QPointF(*EDITOR_POS)
+            lineEdit.setCursorPosition(lineEdit.cursorPositionAt(QPoint(int(pos.x()), int(pos.y()))))
 
     def contextMenuEvent(self, event: QGraphicsSceneContextMenuEvent) -> None:
-        menu = self.inputField.createStandardContextMenu()
+        menu = QMenu()
+        copyAction = menu.addAction("Copy Expression")
+        copyResultAction = menu.addAction("Copy Result")
         menu.addSeparator()
 
         removeAction = menu.addAction("Delete Item")
@@ -107,58 +183,24 @@ class ExpressionItem(QGraphicsRectItem):
         menu.addAction(AlignHAction)
 
         chosen = menu.exec(event.screenPos())
-        scene = self.scene()
+
+        if chosen == copyAction:
+            QApplication.clipboard().setText(self.getInputStream())
+        elif chosen == copyResultAction:
+            QApplication.clipboard().setText(getEvalExecutor().getResultText(self.getId()))
 
         selection:list['ExpressionItem'] = [i for i in ExpressionItem.instances.values() if i.isSelected()]
         for item in selection:
             if chosen == removeAction:
-                try:
-                    if hasattr(item, "inputFieldProxy"):
-                        type(item).instances.pop(item.getId())
-                        ActiveSolver.popEquation(item.getId())
-
-                        item.inputFieldProxy.setWidget(None) # type: ignore
-                        item.inputFieldProxy.widget().deleteLater()
-                except Exception:
-                    pass
-                scene = item.scene()
-                if scene: scene.removeItem(item)
+                item.delete()
                 event.accept()
 
             elif chosen == plotAction:
-                try:
-                    if ActiveSolver.getEquation(self.getId()).getVisType() == VisType.Plot:
-                        ActiveSolver.getEquation(self.getId()).setVisType(VisType.Text)
-                        if item.plot and self.plotProxy:
-                            item.plotProxy.hide()
-                        item.resultLabel.show()
-                        item.resultLabel.overwriteVisibility(False)
-                    elif ActiveSolver.getEquation(self.getId()).getVisType() != VisType.Plot:
-                        ActiveSolver.getEquation(self.getId()).setVisType(VisType.Plot)
-                        item.plotProxy.show()
-#                        item.updatePlot()
-                        item.resultLabel.hide()
-                        item.resultLabel.overwriteVisibility(True)
-                except Exception:
-                    pass
+                item.setVisType(VisType.Plot if plotAction.isChecked() else VisType.Text)
                 event.accept()
 
             elif chosen == latexAction:
-                try:
-                    if ActiveSolver.getEquation(self.getId()).getVisType() == VisType.Latex:
-                        ActiveSolver.getEquation(self.getId()).setVisType(VisType.Text)
-                        item.latexProxy.hide()
-                        item.latex.hide()
-                        item.resultLabel.show()
-                        item.resultLabel.overwriteVisibility(False)
-                    elif ActiveSolver.getEquation(self.getId()).getVisType() != VisType.Latex:
-                        ActiveSolver.getEquation(self.getId()).setVisType(VisType.Latex)
-                        item.latexProxy.show()
-                        item.latex.show()
-                        item.resultLabel.hide()
-                        item.resultLabel.overwriteVisibility(True)
-                except Exception:
-                    pass
+                item.setVisType(VisType.Latex if latexAction.isChecked() else VisType.Text)
                 event.accept()
 
             elif chosen == AlignVAction:
@@ -180,52 +222,207 @@ class ExpressionItem(QGraphicsRectItem):
         return super().contextMenuEvent(event)
 
     def evaluateExpression(self):
-        expr_str = self.inputField.text().strip()
+        expr_str = self.getInputStream()
         if not expr_str:
-            self.resultLabel.setPlainText("")
+            self.setResultText("")
+            return
+        self._debounce.stop()
+        self.setResultText("computing…")
+        getEvalExecutor().submit(self.getId(), self._generation, expr_str)
+
+    def loadStream(self, stream: str) -> None:
+        '''Sets text without evaluating it, result comes from worksheet restore'''
+        self._setStream(stream)
+        self.setResultText("computing…")
+
+    def setVisType(self, visType: VisType) -> None:
+        '''Shows result as text, LaTeX or plot'''
+        getActiveEquation(self.getId()).setVisType(visType)
+        if visType == VisType.Latex:
+            self._requestLatex()
+        if visType == VisType.Plot:
+            self._requestPlot()
+        else:
+            self._hidePlots()
+        self.rearrangeItem()
+
+    def setResultText(self, text: str) -> None:
+        self._resultText = text
+        self._resultWidth = QFontMetricsF(self.getFont()).horizontalAdvance(text)
+        self.rearrangeItem()
+
+    def toggleResultVisible(self) -> None:
+        self._resultVisible = not self._resultVisible
+        self.rearrangeItem()
+
+    def getInputStream(self) -> str:
+        return self._stream.strip()
+
+    def getGeneration(self) -> int:
+        return self._generation
+
+    def updateResult(self) -> None:
+        solverResult: str = getEvalExecutor().getResultText(self.getId())
+        self._resultText = f"= {solverResult}"
+        self._resultWidth = QFontMetricsF(self.getFont()).horizontalAdvance(self._resultText)
+        if self.getEquation().getVisType() == VisType.Latex:
+            self._requestLatex()
+        elif self.getEquation().getVisType() == VisType.Plot:
+            self._requestPlot()
+        self.rearrangeItem()
+
+    def setCurve(self, samples: tuple | None) -> None:
+        '''Shows sampled result below the text, None when it can't be plotted'''
+        self._hidePlots()
+        if samples is None or self.getEquation().getVisType() != VisType.Plot:
+            return
+        if self._curve is None:
+            self._curve = CurveItem(self)
+            self._curve.setPos(EDITOR_POS[0], ITEM_HEIGHT)
+        self._curve.setSamples(*samples)
+        self._curve.show()
+
+    def setFieldTile(self, evaluator, tile) -> None:
+        '''Shows two argument result below the text, filled in as tiles complete'''
+        if self.getEquation().getVisType() != VisType.Plot:
+            evaluator.cancel()
+            return
+        if self._field is None:
+            self._field = FieldItem(self)
+            self._field.setPos(EDITOR_POS[0], ITEM_HEIGHT)
+        if not self._field.isVisible():
+            self._hidePlots()
+            self._field.show()
+        self._field.onTile(evaluator, tile)
+
+    def getCurve(self) -> CurveItem | None:
+        return self._curve
+
+    def getField(self) -> FieldItem | None:
+        return self._field
+
+    def delete(self) -> None:
+        '''Removes item and its equation'''
+        if self.isEditing():
+            getItemEditor().detach()
+        type(self).instances.pop(self.getId(), None)
+        self._debounce.stop()
+        self._hidePlots()
+        getEvalExecutor().submitPop(self.getId())
+        scene = self.scene()
+        if scene: scene.removeItem(self)
+
+    @classmethod
+    def getFont(cls) -> QFont:
+        return QApplication.font()
+
+    @classmethod
+    def setCostOverlay(cls, enabled: bool) -> None:
+        cls.costOverlay = enabled
+        for item in cls.instances.values():
+            item.update()
+
+    @classmethod
+    def refreshCostOverlay(cls) -> None:
+        '''Repaints items whose timings changed since overlay last painted them'''
+        if not cls.costOverlay:
             return
-        try:
-            ActiveSolver.addEquation(self.getId(), expr_str)
-            ActiveSolver.evalEq(self.getId())
-            solverResult: str = ActiveSolver.getEquation(self.getId()).getResultStream()
-            self.resultLabel.setPlainText(f"= {solverResult}")
-            #self.latex.setText(self.evaluator.getLatex()) 
-        except Exception as e:
-            self.resultLabel.setPlainText(f"Error: {str(e)}")
-
-#    def saveFile(self) -> str:
-#        if self.plotting:
-#            plt = "+"
-#        else:
-#            plt = ''
-#        stream = f'{type(self)};{self.pos()};{self.expr};{self.result};{self.lastVarName};{self.varName};{self.description};{plt}'
-#        stream = stream.replace('\n', '')
-#        return stream
-
-#    def setupPlotter(self, evaluator: Solver) -> None:
-#        self.plotProxy.show()
-#        self.plot = PlotWidget(self, plotType=evaluator.getUnsingedSymsCount())
-#        self.plot.axes.cla()
-#        match evaluator.getUnsingedSymsCount():
-#            case 1:
-#                self.plot.axes.plot(evaluator.getAddData('X'), evaluator.getAddData('plotResult'))
-#            case 2:
-#                self.plot.axes.plot_surface(evaluator.getAddData('X'), evaluator.getAddData('Y'), evaluator.getAddData('plotResult'), cmap=cm.magma) #type: ignore
-#        self.plot.draw_idle()
-#        self.plotProxy.setWidget(self.plot)
-#        self.plotProxy.setPos(-60, -17)
+        for item in cls.instances.values():
+            if item.getEquation().getTimings().getTotal() != item._costShown:
+                item.update()
+
+    @classmethod
+    def updateResults(cls, ids: list[int]) -> None:
+        executor = getEvalExecutor()
+        for i in ids:
+            item = cls.instances.get(i)
+            if item and not executor.isPending(i):
+                item.updateResult()
+
+    @classmethod
+    def onResultsReady(cls, id: int, generation: int, ids: list[int]) -> None:
+        item = cls.instances.get(id)
+        if item and item.getGeneration() != generation:
+            # Text changed since the job was submitted, newer result is on its way
+            ids = [i for i in ids if i != id]
+        cls.updateResults(ids)
+
+    @classmethod
+    def onCurveReady(cls, id: int, samples: tuple | None) -> None:
+        item = cls.instances.get(id)
+        if item:
+            item.setCurve(samples)
+
+    @classmethod
+    def onFieldReady(cls, id: int, evaluator, tile) -> None:
+        item = cls.instances.get(id)
+        if item:
+            item.setFieldTile(evaluator, tile)
+        elif tile is not None:
+            evaluator.cancel()
+
+    @classmethod
+    def connectExecutor(cls) -> None:
+        if not ExpressionItem._executorConnected:
+            getEvalExecutor().resultsReady.connect(cls.onResultsReady)
+            getEvalExecutor().curveReady.connect(cls.onCurveReady)
+            getEvalExecutor().fieldReady.connect(cls.onFieldReady)
+            ExpressionItem._executorConnected = True
 
     def checkBlankItem(self) -> None:
-        if not self.inputField.text():
-            try:
-                if hasattr(self, "inputFieldProxy"):
-                    type(self).instances.pop(self.getId())
-                    ActiveSolver.popEquation(self.getId())
-
-                    self.inputFieldProxy.setWidget(None) # type: ignore
-                    self.inputFieldProxy.widget().deleteLater()
-            except Exception:
-                pass
-            scene = self.scene()
-            if scene: scene.removeItem(self)
+        if not self.getInputStream():
+            self.delete()
+
+    # Internal
+    def _setStream(self, stream: str) -> None:
+        self._stream = stream
+        self._inputWidth = QFontMetricsF(self.getFont()).horizontalAdvance(stream)
+
+    def _getResultX(self) -> float:
+        return EDITOR_POS[0] + TEXT_MARGIN + self._inputWidth + RESULT_GAP
+
+    def _isLatexShown(self) -> bool:
+        return self._latexPath is not None and self.getEquation().getVisType() == VisType.Latex
+
+    def _requestLatex(self) -> None:
+        '''Converts result to LaTeX and lays it out on the layout thread, painted when it arrives'''
+        executor = getEvalExecutor()
+        result = executor.getResult(self.getId())
+        if result is None:
+            return
+        # Text stands for the result in the key, text results are quoted so they never share
+        # a key with an expression that prints the same
+        text = executor.getResultText(self.getId())
+        key = (text if not isinstance(result, str) else f'"{text}"', LATEX_FONT[0], LATEX_FONT[1], False)
+        if key == self._latexKey:
+            return
+        self._latexKey = key
+        self._latexStart = time.perf_counter()
+        layouter = get_layouter()
+        cached = layouter.lookup(key)
+        if cached is None:
+            layouter.request(key, self._onLatexReady, result)
+        else:
+            self._onLatexReady(key, *cached)
+
+    def _requestPlot(self) -> None:
+        '''Samples result on the evaluation thread, drawn by setCurve'''
+        if getEvalExecutor().getResult(self.getId()) is not None:
+            getEvalExecutor().submitPlot(self.getId())
+
+    def _hidePlots(self) -> None:
+        if self._curve is not None:
+            self._curve.hide()
+        if self._field is not None:
+            self._field.cancel()
+            self._field.hide()
+
+    def _onLatexReady(self, key: tuple, path: QPainterPath, bounds: QRectF) -> None:
+        if key != self._latexKey:
             return
+        # Layout of a cached path is counted too, it's what the result costs
+        self.getEquation().getTimings().record('latex', self._latexStart, get_layouter().getLayoutTime(key) or 0.0)
+        self._latexPath = path
+        self._latexBounds = bounds
+        self._latexImage = None
+        self.rearrangeItem()
@@ -0,0 +1,245 @@
+from PySide6.QtWidgets import (QGraphicsItem, QGraphicsRectItem, QGraphicsSceneContextMenuEvent, QMenu,
+                               QStyleOptionGraphicsItem, QWidget)
+from PySide6.QtGui import QAction, QColor, QImage, QPainter, QPainterPath, QPen
+from yamcgui.CurveItem import PLOT_SIZE
+from yamcgui.LatexLayout import qt_path
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    import numpy as np
+    from yamcsolve.SurfaceEvaluator import SurfaceEvaluator, SurfaceTile
+
+
+COLORMAP: str = 'viridis'
+NAN_INDEX: int = 255 # color table entry of NaN, transparent
+RANGE_PERCENTILES: tuple[float, float] = (1.0, 99.0) # color range ignores spikes at poles
+RANGE_SAMPLES: int = 256 * 256 # values looked at for color range
+CONTOUR_LEVELS: int = 8
+CONTOUR_CELLS_PER_PIXEL: int = 2 # grid is strided down to this before marching squares
+
+_colorTable: list[int] | None = None
+
+# Marching squares: corner bits a=(i, j) 1, b=(i, j+1) 2, c=(i+1, j+1) 4, d=(i+1, j) 8 set
+# when above level; edges B(a-b) 0, R(b-c) 1, T(d-c) 2, L(a-d) 3. Saddles 5 and 10 are
+# listed for center below level, center above uses _SADDLE_ABOVE.
+_SEGMENTS: dict[int, tuple[tuple[int, int], ...]] = {
+    1: ((3, 0),), 2: ((0, 1),), 3: ((3, 1),), 4: ((1, 2),), 5: ((3, 0), (1, 2)),
+    6: ((0, 2),), 7: ((3, 2),), 8: ((3, 2),), 9: ((0, 2),), 10: ((0, 1), (3, 2)),
+    11: ((1, 2),), 12: ((3, 1),), 13: ((0, 1),), 14: ((3, 0),),
+}
+_SADDLE_ABOVE: dict[int, tuple[tuple[int, int], ...]] = {5: _SEGMENTS[10], 10: _SEGMENTS[5]}
+
+def getColorTable() -> list[int]:
+    '''COLORMAP as 255 QImage colors, last entry transparent for NaN'''
+    global _colorTable
+    if _colorTable is None:
+        import numpy as np
+        from matplotlib import colormaps
+        rgba = (colormaps[COLORMAP](np.linspace(0.0, 1.0, NAN_INDEX)) * 255).round().astype(np.uint32)
+        argb = (rgba[:, 3] << 24) | (rgba[:, 0] << 16) | (rgba[:, 1] << 8) | rgba[:, 2]
+        _colorTable = [int(c) for c in argb] + [0]
+    return _colorTable
+
+def toIndices(values: 'np.ndarray', vmin: float, vmax: float, out: 'np.ndarray') -> None:
+    '''Maps values to color table indices in out, NaN and infinities to NAN_INDEX'''
+    import numpy as np
+    scale = (NAN_INDEX - 1) / (vmax - vmin) if vmax > vmin else 0.0
+    with np.errstate(invalid='ignore', over='ignore'):
+        scaled = (values - vmin) * scale
+        np.clip(scaled, 0, NAN_INDEX - 1, out=scaled)
+    scaled[~np.isfinite(values)] = NAN_INDEX
+    out[...] = scaled
+
+def colorRange(values: 'np.ndarray') -> tuple[float, float] | None:
+    '''Color range from percentiles of an evenly strided sample of values'''
+    import numpy as np
+    step = max(1, int(np.sqrt(values.size / RANGE_SAMPLES)))
+    values = values[::step, ::step]
+    finite = values[np.isfinite(values)]
+    if not finite.size:
+        return None
+    vmin, vmax = (float(v) for v in np.percentile(finite, RANGE_PERCENTILES))
+    return vmin, vmax
+
+def contourSegments(z: 'np.ndarray', level: float) -> 'np.ndarray':
+    '''Marching squares over the whole grid at once. Returns (k, 2, 2) segment
+    endpoints as (column, row) grid coordinates. Cells with a NaN corner are skipped.'''
+    import numpy as np
+    a, b, c, d = z[:-1, :-1], z[:-1, 1:], z[1:, 1:], z[1:, :-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cases = ((a > level) * 1 | (b > level) * 2 | (c > level) * 4 | (d > level) * 8).astype(np.int8)
+        valid = np.isfinite(a) & np.isfinite(b) & np.isfinite(c) & np.isfinite(d)
+        cases[~valid] = 0
+        rows, cols = np.indices(a.shape, dtype=float)
+        # Crossing point on each of the four edges of every cell
+        edges = (
+            (cols + (level - a) / (b - a), rows),
+            (cols + 1, rows + (level - b) / (c - b)),
+            (cols + (level - d) / (c - d), rows + 1),
+            (cols, rows + (level - a) / (d - a)),
+        )
+        centerAbove = (a + b + c + d) / 4 > level
+    segments = []
+    for case, pairs in _SEGMENTS.items():
+        mask = cases == case
+        if case in _SADDLE_ABOVE:
+            for saddlePairs, centerMask in ((pairs, mask & ~centerAbove), (_SADDLE_ABOVE[case], mask & centerAbove)):
+                segments.extend(_gather(edges, saddlePairs, centerMask))
+        else:
+            segments.extend(_gather(edges, pairs, mask))
+    if not segments:
+        return np.empty((0, 2, 2))
+    return np.concatenate(segments)
+
+def _gather(edges: tuple, pairs: tuple[tuple[int, int], ...], mask: 'np.ndarray') -> list['np.ndarray']:
+    import numpy as np
+    if not mask.any():
+        return []
+    out = []
+    for e0, e1 in pairs:
+        (x0, y0), (x1, y1) = edges[e0], edges[e1]
+        out.append(np.stack((np.stack((x0[mask], y0[mask]), -1), np.stack((x1[mask], y1[mask]), -1)), 1))
+    return out
+
+class FieldItem(QGraphicsRectItem):
+    '''Heat map of a two argument result. Values are mapped through a color table
+    straight into the 8 bit buffer a QImage is built on, tile by tile as the
+    SurfaceEvaluator completes them; the coarse preview fills the whole image first.
+    Optional contour lines come from marching squares over the finished grid.'''
+    def __init__(self, parent: QGraphicsItem | None = None) -> None:
+        super().__init__(0, 0, *PLOT_SIZE, parent)
+        self.setPen(QPen(QColor('#999999')))
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        self._evaluator: 'SurfaceEvaluator | None' = None
+        self._buffer: 'np.ndarray | None' = None # owns the pixels of _image
+        self._pixels: 'np.ndarray | None' = None # _buffer rows flipped, y grows upwards
+        self._image: QImage | None = None
+        self._range: tuple[float, float] | None = None
+        self._isComplete: bool = False
+        self._showContours: bool = False
+        self._contours: QPainterPath | None = None
+
+    # Public
+    def setEvaluator(self, evaluator: 'SurfaceEvaluator') -> None:
+        '''Starts showing evaluator's grid, previous one is cancelled'''
+        if evaluator is self._evaluator:
+            return
+        import numpy as np
+        if self._evaluator is not None:
+            self._evaluator.cancel()
+        self._evaluator = evaluator
+        ny, nx = evaluator.getShape()
+        stride = (nx + 3) // 4 * 4 # QImage scan lines are 32 bit aligned
+        self._buffer = np.full((ny, stride), NAN_INDEX, dtype=np.uint8)
+        self._pixels = self._buffer[::-1, :nx]
+        self._image = QImage(self._buffer.data, nx, ny, stride, QImage.Format.Format_Indexed8)
+        self._image.setColorTable(getColorTable())
+        self._range = None
+        self._isComplete = False
+        self._contours = None
+        self.update()
+
+    def getEvaluator(self) -> 'SurfaceEvaluator | None':
+        return self._evaluator
+
+    def onTile(self, evaluator: 'SurfaceEvaluator', tile: 'SurfaceTile | None') -> None:
+        '''Colors a finished tile, None once the whole grid is done'''
+        if evaluator is not self._evaluator:
+            self.setEvaluator(evaluator)
+        import numpy as np
+        if tile is None:
+            self._finish()
+        elif tile[0] == 0:
+            preview = evaluator.getPreview()
+            self._range = colorRange(preview)
+            if self._range is not None:
+                ny, nx = evaluator.getShape()
+                # Colored at preview size, only 8 bit indices are scaled up
+                indices = np.empty(preview.shape, dtype=np.uint8)
+                toIndices(preview, *self._range, indices)
+                rows = np.linspace(0, preview.shape[0] - 1, ny).round().astype(int)
+                cols = np.linspace(0, preview.shape[1] - 1, nx).round().astype(int)
+                self._pixels[...] = indices[rows][:, cols] # type: ignore
+        else:
+            _, r0, r1, c0, c1 = tile
+            values = evaluator.getResult()[r0:r1, c0:c1]
+            if self._range is None:
+                self._range = colorRange(values)
+            if self._range is not None:
+                toIndices(values, *self._range, self._pixels[r0:r1, c0:c1]) # type: ignore
+        self.update()
+
+    def cancel(self) -> None:
+        if self._evaluator is not None and not self._isComplete:
+            self._evaluator.cancel()
+
+    def isComplete(self) -> bool:
+        return self._isComplete
+
+    def setContoursVisible(self, visible: bool) -> None:
+        self._showContours = visible
+        if visible and self._isComplete and self._contours is None:
+            self._contours = self._buildContours()
+        self.update()
+
+    def areContoursVisible(self) -> bool:
+        return self._showContours
+
+    def getColorRange(self) -> tuple[float, float] | None:
+        return self._range
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: QWidget | None = None) -> None:
+        rect = self.rect()
+        if self._image is not None:
+            painter.drawImage(rect, self._image)
+        if self._showContours and self._contours is not None:
+            painter.save()
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+            painter.setPen(QPen(QColor(255, 255, 255, 200), 0.8))
+            painter.drawPath(self._contours)
+            painter.restore()
+        super().paint(painter, option, widget)
+
+    def contextMenuEvent(self, event: QGraphicsSceneContextMenuEvent) -> None:
+        menu = QMenu()
+        contourAction: QAction = QAction('Contour Lines', checkable=True)
+        contourAction.setChecked(self._showContours)
+        menu.addAction(contourAction)
+        if menu.exec(event.screenPos()) == contourAction:
+            self.setContoursVisible(contourAction.isChecked())
+        event.accept()
+
+    # Internal
+    def _finish(self) -> None:
+        '''Recolors whole grid with range of all values, preview's may have been off'''
+        evaluator = self._evaluator
+        if evaluator is None:
+            return
+        result = evaluator.getResult()
+        fullRange = colorRange(result)
+        if fullRange is not None:
+            self._range = fullRange
+            toIndices(result, *fullRange, self._pixels) # type: ignore
+        self._isComplete = True
+        self._contours = self._buildContours() if self._showContours else None
+
+    def _buildContours(self) -> QPainterPath | None:
+        import numpy as np
+        if self._evaluator is None or self._range is None:
+            return None
+        z = self._evaluator.getResult()
+        rect = self.rect()
+        step = max(1, int(max(z.shape[1] / rect.width(), z.shape[0] / rect.height()) / CONTOUR_CELLS_PER_PIXEL))
+        z = z[::step, ::step]
+        ny, nx = z.shape
+        if nx < 2 or ny < 2:
+            return None
+        vmin, vmax = self._range
+        levels = np.linspace(vmin, vmax, CONTOUR_LEVELS + 2)[1:-1]
+        segments = np.concatenate([contourSegments(z, level) for level in levels])
+        if not segments.size:
+            return QPainterPath()
+        # Y-up vertices, qt_path flips them to rect's Y-down coordinates
+        points = segments.reshape(-1, 2) * (rect.width() / (nx - 1), rect.height() / (ny - 1))
+        points[:, 1] -= rect.height()
+        codes = np.tile(np.array([1, 2], dtype=np.uint8), segments.shape[0])
+        return qt_path(points, codes)
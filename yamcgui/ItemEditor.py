@@ -0,0 +1,90 @@
+from PySide6.QtWidgets import QGraphicsProxyWidget
+from shiboken6 import isValid
+from yamcgui.AutoResizeLineEdit import AutoResizeLineEdit
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from yamcgui.ExpressionItem import ExpressionItem
+
+
+EDITOR_POS: tuple[float, float] = (5, 5)
+
+class ItemEditor(QGraphicsProxyWidget):
+    '''The only line edit on the canvas. It is attached to the ExpressionItem being
+    edited, all other items paint their text themselves.'''
+    def __init__(self) -> None:
+        super().__init__()
+        self.lineEdit: AutoResizeLineEdit = AutoResizeLineEdit('')
+        self.lineEdit.setPlaceholderText("Enter expression")
+        self.lineEdit.setFrame(False)
+        self.setWidget(self.lineEdit)
+        self.hide()
+        self._item: 'ExpressionItem | None' = None
+
+        self.lineEdit.textChanged.connect(self._onTextChanged)
+        self.lineEdit.returnPressed.connect(self._onReturnPressed)
+        self.lineEdit.unfocused.connect(self._onUnfocused)
+
+    # Public
+    def attach(self, item: 'ExpressionItem') -> None:
+        '''Places editor over item with its text and gives it focus'''
+        if self._item is item:
+            return
+        self.detach()
+        self._item = item
+        self.lineEdit.gparent = item
+        self.lineEdit.blockSignals(True)
+        self.lineEdit.setText(item.getInputStream())
+        self.lineEdit.blockSignals(False)
+        self.lineEdit.adjustSizeToText()
+        self.setParentItem(item)
+        self.setPos(*EDITOR_POS)
+        self.show()
+        self.setFocus()
+        self.lineEdit.setFocus()
+        item.onEditorAttached()
+
+    def detach(self) -> None:
+        '''Hands painting back to item, editor stays hidden in scene'''
+        item = self._item
+        if item is None:
+            return
+        self._item = None
+        self.lineEdit.gparent = None
+        self.hide()
+        self.setParentItem(None) # type: ignore
+        item.onEditorDetached()
+
+    def getItem(self) -> 'ExpressionItem | None':
+        return self._item
+
+    # Internal
+    def _onTextChanged(self, text: str) -> None:
+        if self._item is not None:
+            self._item.onEditorTextChanged(text)
+
+    def _onReturnPressed(self) -> None:
+        if self._item is not None:
+            self._item.evaluateExpression()
+
+    def _onUnfocused(self) -> None:
+        item = self._item
+        if item is None:
+            return
+        self.detach()
+        item.checkBlankItem()
+
+
+_editor: ItemEditor | None = None
+
+def getItemEditor() -> ItemEditor:
+    global _editor
+    if _editor is None or not isValid(_editor):
+        # Recreated when the scene holding it was destroyed
+        _editor = ItemEditor()
+    return _editor
+
+def getEditedItem() -> 'ExpressionItem | None':
+    '''Item the editor is attached to, without creating the editor'''
+    if _editor is None or not isValid(_editor):
+        return None
+    return _editor.getItem()
@@ -0,0 +1,124 @@
+import time
+from PySide6.QtCore import QObject, QRectF, QTimer
+from PySide6.QtWidgets import QGraphicsView
+from yamcgui.ExpressionItem import ExpressionItem
+from yamcgui.EvalWorker import getEvalExecutor
+from yamcgui.SpatialIndex import SpatialIndex
+from yamcsolve.ActiveSolvers import ActiveEquations
+from yamcsolve.Equation import VisType
+
+
+MARGIN: float = 0.5 # of viewport size, items there are built before they scroll in
+ITEM_EXTENT: tuple[float, float] = (220.0, 30.0)
+RELEASE_DELAY: float = 5.0 # s off screen before item is destroyed
+RELEASE_CHECK: int = 1000 # ms
+UPDATE_DELAY: int = 16 # ms, coalesces scroll events
+
+class ItemMaterializer(QObject):
+    '''Keeps ExpressionItems only for worksheet entries near the viewport.
+    Entries away from it are dormant: stream and visType here, position in a
+    spatial index, result in solver. Items that stay off screen for
+    RELEASE_DELAY are released back to dormant entries.'''
+    def __init__(self, view: QGraphicsView) -> None:
+        super().__init__(view)
+        self._view: QGraphicsView = view
+        self._index: SpatialIndex = SpatialIndex()
+        self._dormant: dict[int, tuple[str, VisType]] = {}
+        self._offScreenSince: dict[int, float] = {}
+
+        self._updateTimer = QTimer(self)
+        self._updateTimer.setSingleShot(True)
+        self._updateTimer.setInterval(UPDATE_DELAY)
+        self._updateTimer.timeout.connect(self.update)
+
+        self._releaseTimer = QTimer(self)
+        self._releaseTimer.setInterval(RELEASE_CHECK)
+        self._releaseTimer.timeout.connect(self.releaseOffscreen)
+        self._releaseTimer.start()
+
+    # Public
+    def addDormant(self, id: int, pos: tuple[float, float], stream: str, visType: VisType = VisType.Text) -> None:
+        self._dormant[id] = (stream, visType)
+        self._index.insert(id, pos[0], pos[1])
+
+    def isDormant(self, id: int) -> bool:
+        return id in self._dormant
+
+    def getDormantPos(self, id: int) -> tuple[float, float] | None:
+        return self._index.getPoint(id) if id in self._dormant else None
+
+    def getLiveCount(self) -> int:
+        return len(ExpressionItem.instances)
+
+    def getDormantCount(self) -> int:
+        return len(self._dormant)
+
+    def getItems(self) -> dict[int, tuple[str, tuple[float, float]]]:
+        '''{id: (stream, pos)} of built and dormant entries'''
+        items: dict[int, tuple[str, tuple[float, float]]] = {}
+        for id, (stream, _) in self._dormant.items():
+            items[id] = (stream, self._index.getPoint(id)) # type: ignore
+        for id, item in ExpressionItem.instances.items():
+            if item.getInputStream():
+                items[id] = (item.getInputStream(), (item.pos().x(), item.pos().y()))
+        return items
+
+    def schedule(self) -> None:
+        self._updateTimer.start()
+
+    def growScene(self) -> None:
+        '''Extends scene rect over all entries so they can be scrolled to'''
+        bounds = self._index.getBounds()
+        if bounds is None:
+            return
+        x0, y0, x1, y1 = bounds
+        rect = QRectF(x0, y0, x1 - x0 + ITEM_EXTENT[0], y1 - y0 + ITEM_EXTENT[1])
+        self._view.setSceneRect(self._view.sceneRect().united(rect))
+
+    def update(self) -> list[int]:
+        '''Builds items for dormant entries near the viewport, returns their ids'''
+        rect = self._getLiveRect()
+        ids = [id for id in self._index.query(rect.left() - ITEM_EXTENT[0], rect.top() - ITEM_EXTENT[1],
+                                             rect.right(), rect.bottom()) if id in self._dormant]
+        for id in ids:
+            self._materialize(id)
+        return ids
+
+    def releaseOffscreen(self, delay: float = RELEASE_DELAY) -> list[int]:
+        '''Releases items away from viewport for longer than delay, returns their ids'''
+        now = time.monotonic()
+        rect = self._getLiveRect()
+        released: list[int] = []
+        for id in [i for i in self._index if i not in self._dormant and i not in ExpressionItem.instances]:
+            self._index.remove(id) # deleted by user
+        for id, item in list(ExpressionItem.instances.items()):
+            self._index.insert(id, item.pos().x(), item.pos().y())
+            if item.sceneBoundingRect().intersects(rect) or item.isBusy() or not item.getInputStream():
+                self._offScreenSince.pop(id, None)
+                continue
+            since = self._offScreenSince.setdefault(id, now)
+            if now - since >= delay:
+                self._offScreenSince.pop(id)
+                self._dormant[id] = (item.getInputStream(), item.getEquation().getVisType())
+                item.release()
+                released.append(id)
+        return released
+
+    # Internal
+    def _getLiveRect(self) -> QRectF:
+        view = self._view
+        rect = view.mapToScene(view.viewport().rect()).boundingRect()
+        dx, dy = rect.width() * MARGIN, rect.height() * MARGIN
+        return rect.adjusted(-dx, -dy, dx, dy)
+
+    def _materialize(self, id: int) -> ExpressionItem:
+        stream, visType = self._dormant.pop(id)
+        x, y = self._index.getPoint(id) # type: ignore
+        item = ExpressionItem(x, y, id)
+        self._view.scene().addItem(item)
+        item.loadStream(stream)
+        item.setVisType(visType)
+        eq = ActiveEquations.get(id)
+        if eq is not None and not eq.getRecalculationReq() and not getEvalExecutor().isPending(id):
+            item.updateResult()
+        return item
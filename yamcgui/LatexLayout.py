@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+import math
+import time
+import weakref
+from typing import Callable
+from PySide6.QtCore import QByteArray, QDataStream, QObject, QRunnable, QRectF, QThreadPool, Qt, Signal, Slot
+from PySide6.QtGui import QImage, QPainter, QPainterPath, QColor
+from shiboken6 import isValid
+from yamcsolve.LruCache import LruCache
+
+# Matplotlib (no GUI backend needed here) is imported on first path build,
+# it costs a large part of startup otherwise
+
+PATH_CACHE_SIZE = 1024  # distinct (text, family, size, usetex) glyph paths kept
+
+# matplotlib.path.Path codes, fixed values so Matplotlib isn't needed to compare them
+_MOVETO, _LINETO, _CURVE3, _CURVE4, _CLOSEPOLY = 1, 2, 3, 4, 79
+# QPainterPath.ElementType values
+_QT_MOVETO, _QT_LINETO, _QT_CURVETO, _QT_CURVEDATA = 0, 1, 2, 3
+
+
+class _LayoutSignals(QObject):
+    finished = Signal(object, object, object, str, float)  # key, path, bounds, error, seconds
+
+
+class _LayoutJob(QRunnable):
+    """
+    Converts one value to LaTeX and builds its glyph path on the layout thread.
+    """
+
+    def __init__(self, key: tuple, value, signals: _LayoutSignals):
+        super().__init__()
+        self._key = key
+        self._value = value
+        self._signals = signals
+
+    def run(self):
+        start = time.perf_counter()
+        try:
+            path, bounds = text_path(latex_text(self._value), *self._key[1:])
+            error = ""
+        except Exception as e:
+            path, bounds, error = None, None, str(e)
+        self._signals.finished.emit(self._key, path, bounds, error, time.perf_counter() - start)
+
+
+class LatexLayouter(QObject):
+    """
+    Converts values to LaTeX and lays out their glyph paths off the GUI thread. Finished
+    paths are kept in a process-wide LRU cache keyed by (text, family, size, usetex), text
+    standing for the value; callers asking for a key that is already being laid out wait
+    for the same job. Cache is only touched on the GUI thread.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        # Matplotlib text layout is not thread safe, one job at a time
+        self._pool.setMaxThreadCount(1)
+        self._signals = _LayoutSignals()
+        self._signals.finished.connect(self._on_finished)
+        # key: (path, bounds, seconds the layout took)
+        self._cache = LruCache(PATH_CACHE_SIZE)
+        self._waiting: dict[tuple, list[weakref.WeakMethod]] = {}
+
+    def lookup(self, key: tuple) -> tuple[QPainterPath, QRectF] | None:
+        entry = self._cache.get(key)
+        return None if entry is None else entry[:2]  # type: ignore
+
+    def request(self, key: tuple, callback: Callable[[tuple, QPainterPath, QRectF], None], value=None):
+        """
+        Lays out value, or the text of key when None, and calls callback(key, path, bounds)
+        on the GUI thread. Only a weak reference to the bound method is kept, deleted items
+        are skipped.
+        """
+        waiting = self._waiting.get(key)
+        if waiting is not None:
+            waiting.append(weakref.WeakMethod(callback))
+            return
+        self._waiting[key] = [weakref.WeakMethod(callback)]
+        self._pool.start(_LayoutJob(key, key[0] if value is None else value, self._signals))
+
+    def getCache(self) -> LruCache:
+        return self._cache
+
+    def getLayoutTime(self, key: tuple) -> float | None:
+        """
+        Seconds the layout thread spent on key, None when it isn't laid out yet.
+        """
+        entry = self._cache.peek(key)
+        return None if entry is None else entry[2]  # type: ignore
+
+    def waitForDone(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
+
+    @Slot(object, object, object, str, float)
+    def _on_finished(self, key: tuple, path: QPainterPath | None, bounds: QRectF | None, error: str, seconds: float):
+        if path is None or bounds is None:
+            # Fall back: display an error as simple vector rect text substitute
+            path = QPainterPath()
+            # Minimal placeholder box
+            path.addRect(0, 0, 200, 40)
+            bounds = path.boundingRect()
+            print(f"[LatexLayout] LaTeX render error: {error}")
+        self._cache.put(key, (path, bounds, seconds))
+        for ref in self._waiting.pop(key, []):
+            callback = ref()
+            if callback is not None and isValid(callback.__self__):
+                callback(key, path, bounds)
+
+
+_layouter: LatexLayouter | None = None
+
+def get_layouter() -> LatexLayouter:
+    global _layouter
+    if _layouter is None:
+        _layouter = LatexLayouter()
+    return _layouter
+
+
+def latex_text(value) -> str:
+    """
+    Mathtext of a SymPy value, plain text is escaped and shown as it is.
+    """
+    if isinstance(value, str):
+        return value.replace("$", r"\$")
+    from sympy import latex
+
+    return f"${latex(value)}$"
+
+
+def text_path(text: str, family: str, size_pt: float, usetex: bool) -> tuple[QPainterPath, QRectF]:
+    """
+    Glyph outline of text and its bounds. Runs on the layout thread, results are
+    cached by LatexLayouter. QPainterPath is implicitly shared, items only read it.
+    """
+    from matplotlib.textpath import TextPath
+    from matplotlib.font_manager import FontProperties
+
+    fp = FontProperties(family=family, size=size_pt)
+    tp = TextPath((0, 0), text, prop=fp, usetex=usetex, _interpolation_steps=1)
+    path = qt_path(tp.vertices, tp.codes)
+    return path, path.boundingRect()
+
+
+def path_image(path: QPainterPath, bounds: QRectF, scale: float, ratio: float, color: QColor) -> QImage:
+    """
+    Paints path scaled from points by scale into an image at device pixel ratio,
+    the top left of bounds at the image origin.
+    """
+    image = QImage(max(1, math.ceil(bounds.width() * scale * ratio)), max(1, math.ceil(bounds.height() * scale * ratio)),
+                   QImage.Format.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(ratio)
+    image.fill(Qt.GlobalColor.transparent)
+
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.scale(scale, scale)
+    painter.translate(-bounds.left(), -bounds.top())
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(color)
+    painter.drawPath(path)
+    painter.end()
+    return image
+
+
+def qt_path(vertices, codes) -> QPainterPath:
+    """
+    Converts Matplotlib path arrays to QPainterPath in one go: elements are laid out
+    with NumPy in the QDataStream format of QPainterPath and read back, so no Qt call
+    is made per vertex. Y is inverted to go from Matplotlib's Y-up to Qt's Y-down.
+    """
+    import numpy as np
+
+    path = QPainterPath()
+    if codes is None or not len(vertices):
+        return path
+    codes = np.asarray(codes)
+    verts = np.asarray(vertices, dtype=float) * (1.0, -1.0)
+    n = len(codes)
+    types = np.full(n, -1, dtype=np.int32)  # -1: vertex produces no element
+    points = verts.copy()
+
+    types[codes == _MOVETO] = _QT_MOVETO
+    types[codes == _LINETO] = _QT_LINETO
+
+    # Cubic: (c1, c2, end) maps directly
+    cubic = np.flatnonzero(codes == _CURVE4)
+    types[cubic] = _QT_CURVEDATA
+    types[cubic[0::3]] = _QT_CURVETO
+
+    # Quadratic: (control, end) is raised to cubic, control becomes two elements
+    quad = np.flatnonzero(codes == _CURVE3)
+    control, end = quad[0::2], quad[1::2]
+    start = verts[control - 1]
+    types[control] = _QT_CURVETO
+    types[end] = _QT_CURVEDATA
+    points[control] = start + 2.0 / 3.0 * (verts[control] - start)
+    second = verts[end] + 2.0 / 3.0 * (verts[control] - verts[end])
+
+    # Close: line back to start of subpath unless already there, as closeSubpath does
+    close = np.flatnonzero(codes == _CLOSEPOLY)
+    subpathStart = np.maximum.accumulate(np.where(codes == _MOVETO, np.arange(n), 0))
+    points[close] = verts[subpathStart[close]]
+    types[close[(verts[close - 1] != points[close]).any(axis=1)]] = _QT_LINETO
+
+    types = np.insert(types, control + 1, _QT_CURVEDATA)
+    points = np.insert(points, control + 1, second, axis=0)
+    keep = types >= 0
+    types, points = types[keep], points[keep]
+    if not len(types):
+        return path
+
+    elements = np.empty(len(types), dtype=[("type", ">i4"), ("x", ">f8"), ("y", ">f8")])
+    elements["type"] = types
+    elements["x"] = points[:, 0]
+    elements["y"] = points[:, 1]
+    moves = np.flatnonzero(types == _QT_MOVETO)
+    current_start = int(moves[-1]) if len(moves) else 0
+    fill_rule = int(Qt.FillRule.OddEvenFill.value)
+    data = (np.array([len(types)], dtype=">i4").tobytes() + elements.tobytes()
+            + np.array([current_start, fill_rule], dtype=">i4").tobytes())
+    QDataStream(QByteArray(data)) >> path
+    return path
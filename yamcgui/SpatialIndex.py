@@ -0,0 +1,68 @@
+from typing import Iterator
+
+
+CELL_SIZE: float = 256.0
+
+class SpatialIndex:
+    '''Uniform grid of item anchor points, answers which ids lie in a rectangle
+    without looking at every item'''
+    def __init__(self, cellSize: float = CELL_SIZE) -> None:
+        self._cellSize: float = cellSize
+        self._cells: dict[tuple[int, int], set[int]] = {}
+        self._points: dict[int, tuple[float, float]] = {}
+
+    # Public
+    def insert(self, id: int, x: float, y: float) -> None:
+        if id in self._points:
+            self.remove(id)
+        self._points[id] = (x, y)
+        self._cells.setdefault(self._cell(x, y), set()).add(id)
+
+    def remove(self, id: int) -> None:
+        point = self._points.pop(id, None)
+        if point is None:
+            return
+        cell = self._cell(*point)
+        ids = self._cells[cell]
+        ids.discard(id)
+        if not ids:
+            del self._cells[cell]
+
+    def getPoint(self, id: int) -> tuple[float, float] | None:
+        return self._points.get(id)
+
+    def query(self, x0: float, y0: float, x1: float, y1: float) -> list[int]:
+        '''Ids with anchor inside [x0, x1] x [y0, y1]'''
+        c0, r0 = self._cell(x0, y0)
+        c1, r1 = self._cell(x1, y1)
+        found: list[int] = []
+        if (c1 - c0 + 1) * (r1 - r0 + 1) > len(self._cells):
+            cells = [ids for (c, r), ids in self._cells.items() if c0 <= c <= c1 and r0 <= r <= r1]
+        else:
+            cells = [self._cells[(c, r)] for c in range(c0, c1 + 1) for r in range(r0, r1 + 1) if (c, r) in self._cells]
+        for ids in cells:
+            for id in ids:
+                x, y = self._points[id]
+                if x0 <= x <= x1 and y0 <= y <= y1:
+                    found.append(id)
+        return found
+
+    def getBounds(self) -> tuple[float, float, float, float] | None:
+        if not self._points:
+            return None
+        xs = [p[0] for p in self._points.values()]
+        ys = [p[1] for p in self._points.values()]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._points
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(list(self._points))
+
+    # Internal
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self._cellSize), int(y // self._cellSize)
@@ -1,8 +1,14 @@
 
-from PySide6.QtWidgets import QGraphicsView#, QFileDialog
-from PySide6.QtGui import QCursor, QBrush, QColor, QKeyEvent
-from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import QGraphicsView, QFileDialog
+from PySide6.QtGui import QCursor, QBrush, QColor, QKeyEvent, QResizeEvent
+from PySide6.QtCore import Qt
 from yamcgui.ExpressionItem import ExpressionItem
+from yamcgui.CostPanel import CostPanel, PANEL_SIZE
+from yamcgui.EvalWorker import getEvalExecutor
+from yamcgui.ItemMaterializer import ItemMaterializer
+from yamcsolve.ActiveSolvers import ActiveEquations
+from yamcsolve.Equation import VisType
+from yamcsolve.Worksheet import FILE_SUFFIX, WorksheetError, readWorksheet
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from yamcgui.Mainwindow import MainWindow
@@ -15,6 +21,8 @@ class View(QGraphicsView):
         self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
         self.setSceneRect(0, 0, 720, 1280)
         self.setBackgroundBrush(self.getBGBrush())
+        self.materializer: ItemMaterializer = ItemMaterializer(self)
+        self.costPanel: CostPanel | None = None
 
     def getBGBrush(self) -> QBrush:
         customBrush = QBrush()
@@ -43,60 +51,43 @@ class View(QGraphicsView):
             scene.addItem(item)
             scene.clearSelection()
             item.setSelected(True)
-            item.inputField.setText(text)
-            QTimer.singleShot(0, lambda: (
-                item.inputField.setFocus(),
-                item.inputField.setCursorPosition(len(text))
-            ))
+            item.beginEdit(text)
             event.accept()
             return
 
         elif event.modifiers() == Qt.KeyboardModifier.ControlModifier and event.key() == Qt.Key.Key_Equal:
             item: 'ExpressionItem'
+            streams: dict[int, str] = {}
             for item in ExpressionItem.instances.values():
-                item.evaluateExpression()
+                if item.getInputStream():
+                    streams[item.getId()] = item.getInputStream()
+            getEvalExecutor().submitAll(streams)
             event.accept()
             return
 
-#        elif event.modifiers() == Qt.ControlModifier and event.key() == Qt.Key_S: # type: ignore
-#
-#            file_path, _ = QFileDialog.getSaveFileName(
-#                parent=None,
-#                caption="Save File",
-#                dir="",
-#                filter="YAMC Files (*.yamc);;Text Files (*.txt);;All Files (*)"
-#            )
-#            with open(file_path, 'w') as file:
-#                for item in ExpressionItem.instanceList:
-#                    file.write(f'{item.saveFile()}\n')
-#            event.accept()
-#            return
+        elif event.modifiers() == Qt.KeyboardModifier.ControlModifier and event.key() == Qt.Key.Key_S:
+            filePath, _ = QFileDialog.getSaveFileName(
+                parent=None,
+                caption="Save File",
+                dir="",
+                filter=f"YAMC Files (*{FILE_SUFFIX});;All Files (*)"
+            )
+            if filePath:
+                self.saveWorksheet(filePath)
+            event.accept()
+            return
 
-        #TODO Add full suport for saving integrals and diffs, currntly dosent support saving differentials, and params for ploting
-#        elif event.modifiers() == Qt.ControlModifier and event.key() == Qt.Key_O: # type: ignore
-#            objDict: dict = {"<class 'items.ExpressionItem'>": ExpressionItem}
-#
-#            file_path, _ = QFileDialog.getOpenFileName(
-#                parent=None,
-#                caption="Save File",
-#                dir="",
-#                filter="YAMC Files (*.yamc);;Text Files (*.txt);;All Files (*)"
-#            )
-#
-#            with open(file_path, 'r') as file:
-#                for line in file:
-#                    parts = line.split(';')
-#                    parts = [x.replace('\n', '') for x in parts]
-#                    cls = objDict[parts[0]]
-#                    point_match = re.search(r'QPointF\(([\d\.\-]+), ([\d\.\-]+)\)', parts[1])
-#                    x, y = float(point_match.group(1)), float(point_match.group(2)) # type: ignore
-#                    obj: ExpressionItem = cls(x, y, parts[2], parts[3], parts[4], parts[5] ,parts[6] ,bool(parts[7]) )
-#                    scene.addItem(obj)
-#                    obj._debounce.start()
-#                    obj.rearrangeItem()
-#                    obj.insertExpr()
-#            event.accept()
-#            return
+        elif event.modifiers() == Qt.KeyboardModifier.ControlModifier and event.key() == Qt.Key.Key_O:
+            filePath, _ = QFileDialog.getOpenFileName(
+                parent=None,
+                caption="Open File",
+                dir="",
+                filter=f"YAMC Files (*{FILE_SUFFIX});;All Files (*)"
+            )
+            if filePath:
+                self.openWorksheet(filePath)
+            event.accept()
+            return
 
 #        elif event.modifiers() == Qt.ControlModifier and event.key() == Qt.Key_W: # type: ignore
 #            item: ExpressionItem
@@ -116,15 +107,80 @@ class View(QGraphicsView):
 #            event.accept()
 #            return
 
+        elif event.modifiers() == Qt.KeyboardModifier.ControlModifier and event.key() == Qt.Key.Key_T:
+            self.setCostOverlay(not ExpressionItem.costOverlay)
+            event.accept()
+            return
+
         elif event.modifiers() == Qt.ControlModifier and event.key() == Qt.Key.Key_Period: # type: ignore
             selection: list[ExpressionItem] = scene.selectedItems() #type: ignore
             for i in selection:
-                if i.resultLabel.isVisible():
-                    i.resultLabel.hide()
-                    i.resultLabel.overwriteVisibility(False)
-                else:
-                    i.resultLabel.show()
-                    i.resultLabel.overwriteVisibility(True)
+                i.toggleResultVisible()
             event.accept()
             return
-        super().keyPressEvent(event)
\ No newline at end of file
+        super().keyPressEvent(event)
+
+    def scrollContentsBy(self, dx: int, dy: int) -> None:
+        super().scrollContentsBy(dx, dy)
+        self.materializer.schedule()
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self.materializer.schedule()
+        self._placeCostPanel()
+
+    def setCostOverlay(self, enabled: bool) -> None:
+        '''Colors items by time their equation took and shows slowest equations panel'''
+        ExpressionItem.setCostOverlay(enabled)
+        if self.costPanel is None:
+            if not enabled:
+                return
+            self.costPanel = CostPanel(self)
+            self.costPanel.refreshed.connect(ExpressionItem.refreshCostOverlay)
+            self.costPanel.equationActivated.connect(self.showEquation)
+        self._placeCostPanel()
+        self.costPanel.setVisible(enabled)
+
+    def showEquation(self, id: int) -> None:
+        '''Scrolls item of equation id into view and selects it'''
+        pos = self.materializer.getDormantPos(id)
+        if pos is not None:
+            self.centerOn(*pos)
+            self.materializer.update()
+        item = ExpressionItem.instances.get(id)
+        if item is not None:
+            self.centerOn(item)
+            self.scene().clearSelection()
+            item.setSelected(True)
+
+    def saveWorksheet(self, filePath: str) -> None:
+        '''Saves on evaluation thread, current text of items and dormant entries included'''
+        getEvalExecutor().submitSave(filePath, self.materializer.getItems())
+
+    def openWorksheet(self, filePath: str) -> None:
+        '''Adds worksheet entries as dormant, only those near the viewport get items.
+        Stored results are reused by solver where still valid'''
+        try:
+            records = readWorksheet(filePath)
+        except (OSError, WorksheetError) as e:
+            print(f'openWorksheet failed due to: {e}')
+            return
+        ids: list[int] = []
+        for record in records:
+            id = ActiveEquations.reserveId()
+            x, y = record['pos']
+            self.materializer.addDormant(id, (float(x), float(y)), record['stream'],
+                                         VisType[record.get('visType', VisType.Text.name)])
+            ids.append(id)
+        getEvalExecutor().submitRestore(records, ids)
+        self.materializer.growScene()
+        self.materializer.update()
+
+    # Internal
+    def _placeCostPanel(self) -> None:
+        '''Keeps panel in the top right corner of the viewport'''
+        if self.costPanel is None:
+            return
+        rect = self.viewport().geometry()
+        self.costPanel.resize(min(PANEL_SIZE[0], rect.width()), min(PANEL_SIZE[1], rect.height()))
+        self.costPanel.move(rect.right() - self.costPanel.width(), rect.top())
@@ -1,4 +1,33 @@
-from yamcsolve.SymPySolver import SymPySolver
+from typing import TYPE_CHECKING
+from yamcsolve.Equation import Equation, NoneEquation
+from yamcsolve.EquationStore import EquationStore
+if TYPE_CHECKING:
+    from yamcsolve.SymPySolver import SymPySolver
 
 
-ActiveSolver: SymPySolver = SymPySolver()
\ No newline at end of file
+# Ids can be reserved before SymPy is loaded, solver adopts the store
+ActiveEquations: EquationStore = EquationStore()
+_activeSolver: 'SymPySolver | None' = None
+
+def getActiveSolver() -> 'SymPySolver':
+    '''App solver, imports SymPy on first call'''
+    global _activeSolver
+    if _activeSolver is None:
+        from yamcsolve.SymPySolver import SymPySolver
+        _activeSolver = SymPySolver(equations=ActiveEquations)
+    return _activeSolver
+
+def getActiveEquation(id: int) -> Equation:
+    '''Equation of id without loading solver'''
+    eq = ActiveEquations.get(id)
+    return NoneEquation('') if eq is None else eq
+
+def warmUp() -> None:
+    '''Loads solver and parses a trivial equation so first real one is fast'''
+    getActiveSolver().warmUp()
+
+def __getattr__(name: str):
+    # "from yamcsolve.ActiveSolvers import ActiveSolver" still works, loading solver
+    if name == 'ActiveSolver':
+        return getActiveSolver()
+    raise AttributeError(name)
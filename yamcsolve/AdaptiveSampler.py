@@ -0,0 +1,74 @@
+from typing import Callable
+import numpy as np
+
+
+SAMPLE_BUDGET: int = 2000
+INITIAL_SAMPLES: int = 65
+REFINE_TOL: float = 2e-3 # of robust y span
+
+def _evalBatch(f: Callable, x: np.ndarray) -> np.ndarray:
+    with np.errstate(all='ignore'):
+        y = np.asarray(f(x))
+    if np.iscomplexobj(y):
+        y = np.where(np.abs(y.imag) <= 1e-12 * (1 + np.abs(y.real)), y.real, np.nan)
+    y = np.broadcast_to(y, x.shape).astype(float)
+    y[~np.isfinite(y)] = np.nan
+    return y
+
+def _robustSpan(y: np.ndarray) -> float:
+    '''y span ignoring extreme values, so poles don't swamp the tolerance'''
+    finite = y[np.isfinite(y)]
+    if finite.size < 2:
+        return 1.0
+    lo, hi = np.percentile(finite, [2, 98])
+    return float(hi - lo) or float(np.abs(finite).max()) or 1.0
+
+def _intervalErrors(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    '''Error estimate per interval: deviation of each inner sample from the chord
+    of its neighbours, assigned to both intervals around it. Intervals with NaN
+    at one end only get infinite error so domain edges are located.'''
+    t = (x[1:-1] - x[:-2]) / (x[2:] - x[:-2])
+    with np.errstate(invalid='ignore'):
+        dev = np.abs(y[1:-1] - (y[:-2] + t * (y[2:] - y[:-2])))
+    dev[np.isnan(dev)] = 0
+    err = np.zeros(x.size - 1)
+    err[:-1] = dev
+    err[1:] = np.maximum(err[1:], dev)
+    err[np.isnan(y[:-1]) != np.isnan(y[1:])] = np.inf
+    return err
+
+def sampleAdaptive(f: Callable, a: float, b: float, budget: int = SAMPLE_BUDGET,
+                   initial: int = INITIAL_SAMPLES, tol: float = REFINE_TOL) -> tuple[np.ndarray, np.ndarray]:
+    '''Samples vectorized f on [a, b] with at most budget points. Intervals with
+    high curvature or a NaN edge are bisected, a whole batch per NumPy call,
+    worst first once the budget gets tight. Poles are cut with NaN so the curve
+    isn't drawn as a vertical spike across them.'''
+    x = np.linspace(a, b, max(3, min(initial, budget)))
+    y = _evalBatch(f, x)
+    minWidth = abs(b - a) * 1e-12
+    while x.size < budget:
+        err = _intervalErrors(x, y)
+        err[np.diff(x) <= minWidth] = 0
+        candidates = np.nonzero(err > tol * _robustSpan(y))[0]
+        if not candidates.size:
+            break
+        room = budget - x.size
+        if candidates.size > room:
+            candidates = np.sort(candidates[np.argsort(err[candidates])[-room:]])
+        newX = 0.5 * (x[candidates] + x[candidates + 1])
+        x = np.insert(x, candidates + 1, newX)
+        y = np.insert(y, candidates + 1, _evalBatch(f, newX))
+    return cutPoles(x, y)
+
+def cutPoles(x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    '''Inserts NaN into sign changing jumps larger than the robust y span'''
+    if y.size < 2:
+        return x, y
+    with np.errstate(invalid='ignore'):
+        jump = (np.sign(y[:-1]) * np.sign(y[1:]) < 0) & (np.abs(np.diff(y)) > 2 * _robustSpan(y))
+    idx = np.nonzero(jump)[0]
+    if not idx.size:
+        return x, y
+    x = np.insert(x, idx + 1, 0.5 * (x[idx] + x[idx + 1]))
+    y = np.insert(y, idx + 1, np.nan)
+    return x, y
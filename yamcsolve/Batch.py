@@ -0,0 +1,133 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import redirect_stdout
+from typing import Callable
+import argparse
+import json
+import multiprocessing as mp
+import queue
+import sys
+import time
+from yamcsolve.SymPySolver import SymPySolver
+from yamcsolve.Worksheet import isWorksheetFile, readWorksheet, restoreWorksheet
+
+
+COMMENT: str = '#'
+POLL: float = 0.1 # s
+
+def loadWorksheet(path: str) -> list[tuple[int, str]]:
+    '''(line number, equation) of plain text worksheet, one equation per line.
+    Blank lines and lines starting with # are skipped'''
+    with open(path, encoding='utf-8') as f:
+        lines = [(n, line.strip()) for n, line in enumerate(f, 1)]
+    return [(n, line) for n, line in lines if line and not line.startswith(COMMENT)]
+
+def makeRecord(path: str, line: int, solver: SymPySolver, id: int, ms: float) -> dict:
+    eq = solver.getEquation(id)
+    result = eq.getResultStream()
+    return {'file': path, 'line': line, 'stream': eq.getStream(), 'type': eq.getEvalType().name,
+            'var': eq.getMyVarName(), 'result': result, 'error': result.startswith('Error'), 'ms': round(ms, 3)}
+
+def errorRecord(path: str, e: BaseException) -> dict:
+    return {'file': path, 'line': None, 'stream': None, 'type': None,
+            'var': None, 'result': f'Error: {e}', 'error': True, 'ms': 0.0}
+
+def evaluateWorksheet(path: str, emit: Callable[[dict], None], sandboxed: bool = True) -> None:
+    '''Evaluates worksheet in dependency order, emitting one record per
+    equation as soon as it finishes. Solver diagnostics go to stderr'''
+    with redirect_stdout(sys.stderr):
+        _evaluate(path, emit, sandboxed)
+
+def _evaluate(path: str, emit: Callable[[dict], None], sandboxed: bool) -> None:
+    solver = SymPySolver(sandboxed=sandboxed)
+    lines: dict[int, int] = {}
+    items: list[dict] | None = None
+    if isWorksheetFile(path):
+        # Saved worksheet, line is item number; stored results are reused when still valid
+        items = readWorksheet(path)
+        for n, _ in enumerate(items, 1):
+            lines[solver.getFreeId()] = n
+    else:
+        for line, stream in loadWorksheet(path):
+            id = solver.getFreeId()
+            lines[id] = line
+            solver.addEquation(id, stream)
+    last = time.perf_counter()
+
+    def onEvaluated(id: int) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        emit(makeRecord(path, lines[id], solver, id, (now - last) * 1000))
+        last = now
+
+    if items is not None:
+        restoreWorksheet(solver, items, list(lines), onEvaluated)
+    else:
+        solver.recomputeAll(onEvaluated)
+
+def runSerial(paths: list[str], emit: Callable[[dict], None], sandboxed: bool = True) -> None:
+    for path in paths:
+        try:
+            evaluateWorksheet(path, emit, sandboxed)
+        except Exception as e:
+            emit(errorRecord(path, e))
+
+def runParallel(paths: list[str], emit: Callable[[dict], None], jobs: int, sandboxed: bool = True) -> None:
+    '''Evaluates files on jobs worker processes. Workers put records on a
+    queue as they go, so output keeps streaming while files are in progress.
+    None on the queue marks a finished file'''
+    ctx = mp.get_context('spawn')
+    records = ctx.Queue()
+    with ProcessPoolExecutor(jobs, mp_context=ctx, initializer=_initWorker, initargs=(records,)) as pool:
+        futures: dict[Future, str] = {pool.submit(_workerRun, path, sandboxed): path for path in paths}
+        remaining = len(paths)
+        while remaining:
+            try:
+                record = records.get(timeout=POLL)
+            except queue.Empty:
+                # Worker died before marking its file finished
+                for future in [f for f in futures if f.done()]:
+                    path = futures.pop(future)
+                    if future.exception() is not None:
+                        emit(errorRecord(path, future.exception())) # type: ignore
+                        remaining -= 1
+                continue
+            if record is None:
+                remaining -= 1
+            else:
+                emit(record)
+
+def main(argv: list[str] | None = None) -> int:
+    '''Command line batch mode, prints JSON lines. Exit code 1 when any equation failed'''
+    parser = argparse.ArgumentParser(prog='yamcbatch', description='Evaluate worksheets without GUI, one JSON record per equation')
+    parser.add_argument('files', nargs='+', help='saved .yamc worksheets or plain text, one equation per line')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='worker processes across files')
+    parser.add_argument('--no-sandbox', action='store_true', help='run integrate, diff and solve in process')
+    args = parser.parse_args(argv)
+    failed = False
+    out = sys.stdout
+
+    def emit(record: dict) -> None:
+        nonlocal failed
+        failed = failed or record['error']
+        out.write(json.dumps(record) + '\n')
+        out.flush()
+
+    if args.jobs > 1 and len(args.files) > 1:
+        runParallel(args.files, emit, min(args.jobs, len(args.files)), not args.no_sandbox)
+    else:
+        runSerial(args.files, emit, not args.no_sandbox)
+    return 1 if failed else 0
+
+_records = None
+
+def _initWorker(records) -> None:
+    global _records
+    _records = records
+
+def _workerRun(path: str, sandboxed: bool) -> None:
+    try:
+        evaluateWorksheet(path, _records.put, sandboxed) # type: ignore
+    except Exception as e:
+        _records.put(errorRecord(path, e)) # type: ignore
+    finally:
+        _records.put(None) # type: ignore
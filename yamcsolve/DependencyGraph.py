@@ -0,0 +1,87 @@
+from collections import deque
+
+
+class DependencyGraph:
+    '''Directed graph between equations. Edge goes from the equation defining
+    a variable to every equation reading it.'''
+    def __init__(self) -> None:
+        self._definers: dict[str, list[int]] = {}
+        self._readers: dict[str, set[int]] = {}
+        self._names: dict[int, str | None] = {}
+        self._deps: dict[int, list[str]] = {}
+
+    # Public
+    def setNode(self, id: int, varName: str | None, deps: list[str]) -> None:
+        self.removeNode(id)
+        self._names[id] = varName
+        self._deps[id] = list(deps)
+        if varName:
+            self._definers.setdefault(varName, []).append(id)
+        for name in deps:
+            self._readers.setdefault(name, set()).add(id)
+
+    def removeNode(self, id: int) -> None:
+        if id not in self._names:
+            return
+        varName = self._names.pop(id)
+        if varName:
+            definers = self._definers[varName]
+            definers.remove(id)
+            if not definers:
+                self._definers.pop(varName)
+        for name in self._deps.pop(id):
+            readers = self._readers[name]
+            readers.discard(id)
+            if not readers:
+                self._readers.pop(name)
+
+    def getDefiner(self, varName: str) -> int | None:
+        '''Returns id of the equation whose value is used for varName'''
+        definers = self._definers.get(varName)
+        return definers[-1] if definers else None
+
+    def getReaders(self, varName: str) -> set[int]:
+        return set(self._readers.get(varName, ()))
+
+    def isDependent(self, id: int) -> bool:
+        return any(self.getDefiner(name) is not None for name in self._deps.get(id, ()))
+
+    def getDownstream(self, ids: list[int] | set[int]) -> set[int]:
+        '''Returns ids together with every equation reachable from them'''
+        seen: set[int] = {i for i in ids if i in self._names}
+        queue: deque[int] = deque(seen)
+        while queue:
+            varName = self._names[queue.popleft()]
+            if not varName:
+                continue
+            for reader in self._readers.get(varName, ()):
+                if reader not in seen:
+                    seen.add(reader)
+                    queue.append(reader)
+        return seen
+
+    def getLevels(self, ids: set[int]) -> tuple[list[list[int]], list[int]]:
+        '''Groups ids into levels. Equations of one level only read equations
+        from earlier levels, so they can be evaluated independently.
+        Returns (levels, cyclic), ids within a level are sorted.'''
+        successors: dict[int, list[int]] = {i: [] for i in ids}
+        inDegree: dict[int, int] = {i: 0 for i in ids}
+        for i in ids:
+            preds = {self.getDefiner(name) for name in self._deps[i]}
+            for p in preds:
+                if p in successors:
+                    successors[p].append(i)
+                    inDegree[i] += 1
+        level: list[int] = sorted(i for i in ids if inDegree[i] == 0)
+        levels: list[list[int]] = []
+        while level:
+            levels.append(level)
+            nextLevel: list[int] = []
+            for i in level:
+                for s in successors[i]:
+                    inDegree[s] -= 1
+                    if inDegree[s] == 0:
+                        nextLevel.append(s)
+            level = sorted(nextLevel)
+        cyclic: list[int] = sorted(i for i in ids if inDegree[i] > 0)
+        return levels, cyclic
@@ -0,0 +1,135 @@
+from fractions import Fraction
+import numpy as np
+from sympy import Add, Mul, Rational, S
+from sympy.physics import units as u
+from sympy.physics.units import Quantity
+from yamcsolve.SandboxPool import SandboxedFunction
+
+
+BASE_UNITS: list[Quantity] = [u.meter, u.kilogram, u.second, u.ampere, u.kelvin, u.mole, u.candela]
+
+def _dims(m: int = 0, kg: int = 0, s: int = 0, A: int = 0, K: int = 0, mol: int = 0, cd: int = 0) -> tuple[int, ...]:
+    return (m, kg, s, A, K, mol, cd)
+
+LENGTH = _dims(m=1)
+MASS = _dims(kg=1)
+TIME = _dims(s=1)
+FORCE = _dims(m=1, kg=1, s=-2)
+PRESSURE = _dims(m=-1, kg=1, s=-2)
+ENERGY = _dims(m=2, kg=1, s=-2)
+POWER = _dims(m=2, kg=1, s=-3)
+CHARGE = _dims(s=1, A=1)
+VOLTAGE = _dims(m=2, kg=1, s=-3, A=-1)
+LBF = Fraction('0.45359237') * Fraction('9.80665')
+
+# Quantity: (factor to SI base units, exponents over BASE_UNITS)
+UNIT_TABLE: dict[Quantity, tuple[Fraction, tuple[int, ...]]] = {
+    u.meter: (Fraction(1), LENGTH), u.kilometer: (Fraction(1000), LENGTH),
+    u.centimeter: (Fraction(1, 100), LENGTH), u.millimeter: (Fraction(1, 1000), LENGTH),
+    u.micrometer: (Fraction(1, 10**6), LENGTH), u.nanometer: (Fraction(1, 10**9), LENGTH),
+    u.inch: (Fraction('0.0254'), LENGTH), u.foot: (Fraction('0.3048'), LENGTH), u.mile: (Fraction('1609.344'), LENGTH),
+    u.kilogram: (Fraction(1), MASS), u.gram: (Fraction(1, 1000), MASS),
+    u.milligram: (Fraction(1, 10**6), MASS), u.tonne: (Fraction(1000), MASS),
+    u.second: (Fraction(1), TIME), u.millisecond: (Fraction(1, 1000), TIME),
+    u.minute: (Fraction(60), TIME), u.hour: (Fraction(3600), TIME), u.day: (Fraction(86400), TIME),
+    u.ampere: (Fraction(1), _dims(A=1)), u.kelvin: (Fraction(1), _dims(K=1)),
+    u.mole: (Fraction(1), _dims(mol=1)), u.candela: (Fraction(1), _dims(cd=1)),
+    u.liter: (Fraction(1, 1000), _dims(m=3)), u.hertz: (Fraction(1), _dims(s=-1)),
+    u.newton: (Fraction(1), FORCE),
+    u.pascal: (Fraction(1), PRESSURE), u.kPa: (Fraction(1000), PRESSURE),
+    u.bar: (Fraction(10**5), PRESSURE), u.psi: (LBF / Fraction('0.0254')**2, PRESSURE),
+    u.joule: (Fraction(1), ENERGY), u.watt: (Fraction(1), POWER),
+    u.coulomb: (Fraction(1), CHARGE), u.volt: (Fraction(1), VOLTAGE),
+    u.ohm: (Fraction(1), _dims(m=2, kg=1, s=-3, A=-2)), u.siemens: (Fraction(1), _dims(m=-2, kg=-1, s=3, A=2)),
+    u.farad: (Fraction(1), _dims(m=-2, kg=-1, s=4, A=2)), u.henry: (Fraction(1), _dims(m=2, kg=1, s=-2, A=-2)),
+    u.weber: (Fraction(1), _dims(m=2, kg=1, s=-2, A=-1)), u.tesla: (Fraction(1), _dims(kg=1, s=-2, A=-1)),
+}
+# Dimension vector: unit results are shown in (replaces SI_EXTENDED string mapping)
+DISPLAY_UNITS: dict[tuple[int, ...], Quantity] = {
+    FORCE: u.newton, PRESSURE: u.pascal, ENERGY: u.joule, POWER: u.watt,
+    CHARGE: u.coulomb, VOLTAGE: u.volt, _dims(m=2, kg=1, s=-3, A=-2): u.ohm,
+    _dims(m=-2, kg=-1, s=3, A=2): u.siemens, _dims(m=-2, kg=-1, s=4, A=2): u.farad,
+    _dims(m=2, kg=1, s=-2, A=-2): u.henry, _dims(m=2, kg=1, s=-2, A=-1): u.weber,
+    _dims(kg=1, s=-2, A=-1): u.tesla, _dims(s=-1): u.hertz,
+    **{tuple(row): unit for row, unit in zip(np.eye(7, dtype=int), BASE_UNITS)},
+}
+
+_UNITS: dict[Quantity, int] = {unit: i for i, unit in enumerate(UNIT_TABLE)}
+_FACTORS: list[Fraction] = [factor for factor, _ in UNIT_TABLE.values()]
+_EXPONENTS: np.ndarray = np.array([dims for _, dims in UNIT_TABLE.values()], dtype=np.int64)
+_sympyConvertTo = SandboxedFunction('convert_to')
+
+def _splitTerm(term) -> tuple | None:
+    '''(coefficient, factor to SI, dimension vector) of a product term,
+    None when it holds units outside UNIT_TABLE or non integer unit powers'''
+    coefs: list = []
+    idx: list[int] = []
+    powers: list[int] = []
+    for f in Mul.make_args(term):
+        base, exp = f.as_base_exp()
+        i = _UNITS.get(base)
+        if i is not None and exp.is_Integer:
+            idx.append(i)
+            powers.append(int(exp))
+        elif f.has(Quantity):
+            return None
+        else:
+            coefs.append(f)
+    factor = Fraction(1)
+    for i, p in zip(idx, powers):
+        factor *= _FACTORS[i] ** p
+    dims = np.asarray(powers, dtype=np.int64) @ _EXPONENTS[idx] if idx else np.zeros(7, dtype=np.int64)
+    return Mul(*coefs), factor, dims
+
+def _splitTerms(expr) -> tuple[list, list[Fraction], np.ndarray] | None:
+    terms = [_splitTerm(t) for t in Add.make_args(expr)]
+    if any(t is None for t in terms):
+        return None
+    return [t[0] for t in terms], [t[1] for t in terms], np.array([t[2] for t in terms]) # type: ignore
+
+def _rational(factor: Fraction):
+    return Rational(factor.numerator, factor.denominator)
+
+def _baseUnits(dims) -> object:
+    return Mul(*[unit**int(p) for unit, p in zip(BASE_UNITS, dims) if p])
+
+def dimensionOf(expr) -> tuple[int, ...] | None:
+    '''Exponents over BASE_UNITS, None for unknown units or mixed dimension sums'''
+    split = _splitTerms(expr)
+    if split is None:
+        return None
+    dims = split[2]
+    if (dims != dims[0]).any():
+        return None
+    return tuple(int(p) for p in dims[0])
+
+def simplifyUnits(expr):
+    '''Rewrites unit expression in SI, using the preferred display unit of
+    its dimension (kg*m/s**2 -> N). Sums need matching dimensions'''
+    split = _splitTerms(expr)
+    if split is None:
+        return expr
+    coefs, factors, dims = split
+    if (dims != dims[0]).any():
+        raise ValueError('incompatible dimensions')
+    value = Add(*[c * _rational(f) for c, f in zip(coefs, factors)])
+    key = tuple(int(p) for p in dims[0])
+    if not any(key):
+        return value
+    unit = DISPLAY_UNITS.get(key)
+    return value * (unit if unit is not None else _baseUnits(key))
+
+def convertUnits(expr, target):
+    '''convert_to for units in UNIT_TABLE done with precomputed factors;
+    other units, target lists and mismatched dimensions go to SymPy'''
+    if isinstance(target, (list, tuple)):
+        return _sympyConvertTo(expr, target)
+    split = _splitTerms(expr)
+    targetSplit = _splitTerm(target)
+    if split is None or targetSplit is None or targetSplit[0] != S.One:
+        return _sympyConvertTo(expr, target)
+    coefs, factors, dims = split
+    _, targetFactor, targetDims = targetSplit
+    if (dims != targetDims).any():
+        return _sympyConvertTo(expr, target)
+    return Add(*[c * _rational(f / targetFactor) for c, f in zip(coefs, factors)]) * target
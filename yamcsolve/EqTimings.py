@@ -0,0 +1,84 @@
+from contextlib import contextmanager
+from typing import Iterator, TYPE_CHECKING
+import json
+import time
+if TYPE_CHECKING:
+    from yamcsolve.Equation import Equation
+
+
+# evaluate: SymPy parsing, substitution of variables and evaluation (parse_expr
+# does them in one go), latex: conversion and glyph layout of the result,
+# plot: sampling of the result
+STAGES: tuple[str, ...] = ('evaluate', 'latex', 'plot')
+
+class EqTimings:
+    '''Start (perf_counter seconds) and duration of the last run of each stage of
+    one equation and whether its last evaluation came from cache. Stages run on
+    different threads, each one only writes its own entry.'''
+    __slots__ = ('_spans', '_cacheHit')
+
+    def __init__(self) -> None:
+        self._spans: dict[str, tuple[float, float]] = {}
+        self._cacheHit: bool | None = None
+
+    # Public
+    def record(self, stage: str, start: float, duration: float) -> None:
+        self._spans[stage] = (start, duration)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        '''Records time spent in the with block as stage, also when it raises'''
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, start, time.perf_counter() - start)
+
+    def getSpan(self, stage: str) -> tuple[float, float] | None:
+        return self._spans.get(stage)
+
+    def getDuration(self, stage: str) -> float:
+        span = self._spans.get(stage)
+        return 0.0 if span is None else span[1]
+
+    def getTotal(self) -> float:
+        return sum(span[1] for span in self._spans.values())
+
+    def setCacheHit(self, cacheHit: bool | None) -> None:
+        self._cacheHit = cacheHit
+
+    def getCacheHit(self) -> bool | None:
+        '''None while equation wasn't evaluated or its type isn't cached'''
+        return self._cacheHit
+
+    def toDict(self) -> dict:
+        return {'total': self.getTotal(), 'cacheHit': self._cacheHit,
+                **{stage: self.getDuration(stage) for stage in STAGES}}
+
+def timingsReport(items: list[tuple[int, 'Equation']]) -> list[dict]:
+    '''Timings of equations {id, stream, total, cacheHit, <stage>...}, slowest first'''
+    report = [{'id': id, 'stream': eq.getStream(), **eq.getTimings().toDict()} for id, eq in items]
+    report.sort(key=lambda entry: entry['total'], reverse=True)
+    return report
+
+def timingsTrace(items: list[tuple[int, 'Equation']]) -> dict:
+    '''Chrome trace (chrome://tracing, Perfetto) with one row per equation and
+    a complete event per stage, times in microseconds'''
+    spans = [(id, eq, stage, eq.getTimings().getSpan(stage)) for id, eq in items for stage in STAGES]
+    spans = [s for s in spans if s[3] is not None]
+    origin = min((s[3][0] for s in spans), default=0.0) # type: ignore
+    events: list[dict] = []
+    for id, eq in items:
+        events.append({'name': 'thread_name', 'ph': 'M', 'pid': 0, 'tid': id,
+                       'args': {'name': f'{id}: {eq.getStream()}'}})
+    for id, eq, stage, (start, duration) in spans: # type: ignore
+        events.append({'name': stage, 'cat': 'equation', 'ph': 'X', 'pid': 0, 'tid': id,
+                       'ts': (start - origin) * 1e6, 'dur': duration * 1e6,
+                       'args': {'stream': eq.getStream(), 'cacheHit': eq.getTimings().getCacheHit()}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+def writeTimings(path: str, items: list[tuple[int, 'Equation']], trace: bool = False) -> None:
+    '''Writes timingsReport as JSON or, with trace, timingsTrace'''
+    data = timingsTrace(items) if trace else {'equations': timingsReport(items)}
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, indent=1)
@@ -1,4 +1,6 @@
 from enum import Enum, auto
+from yamcsolve.Lexer import Lexed, lex
+from yamcsolve.EqTimings import EqTimings
 
 
 class EqEvalType(Enum):
@@ -13,30 +15,57 @@ class VisType(Enum):
     Plot = auto()
 
 class Equation:
+    '''Equation text, what the lexer found in it and its evaluated result.
+    Result is kept as the object solver produced (SymPy expression, list of
+    solutions or error text); its string form is rendered on first request'''
+    __slots__ = ('_evalType', '_visType', '_stream', '_result', '_resultText', '_myVarName',
+                 '_varsIDepOn', '_depVersions', '_isDependent', '_hasCyclicDepInfo',
+                 '_isChanged', '_recalculationReq', '_lexed', '_pos', '_timings')
+
     def __init__(self, eq: str) -> None:
         self._evalType: EqEvalType = EqEvalType.Eval
         self._visType: VisType = VisType.Text
         self._stream: str = eq
-        self._resultStream: str = ''
+        self._result: object = ''
+        self._resultText: str | None = ''
         self._myVarName: str | None = None
         self._varsIDepOn: list[str] = []
+        self._depVersions: tuple[int, ...] = ()
         self._isDependent: bool = False
         self._hasCyclicDepInfo: bool = False
         self._isChanged: bool = False
         self._recalculationReq: bool = False
+        self._pos: tuple[float, float] = (0.0, 0.0)
+        self._timings: EqTimings = EqTimings()
+        self._lexed: Lexed = lex(eq)
+        self._applyLexed()
 
     # Public
     def setStream(self, stream: str) -> None:
+        '''Sets stream and records what the lexer found in it (name, symbols, ...)'''
+        if stream != self._stream:
+            self._lexed = lex(stream)
+            self._applyLexed()
         self._stream = stream
 
     def getStream(self) -> str:
         return self._stream
 
+    def setResult(self, result) -> None:
+        self._result = result
+        self._resultText = None
+
+    def getResult(self):
+        return self._result
+
     def setResultStream(self, stream: str) -> None:
-        self._resultStream = stream
+        self.setResult(stream)
 
     def getResultStream(self) -> str:
-        return self._resultStream
+        '''String form of result, rendered once per result'''
+        if self._resultText is None:
+            self._resultText = str(self._result)
+        return self._resultText
     
     def setEvalType(self, evalType: EqEvalType):
         self._evalType = evalType
@@ -50,21 +79,53 @@ class Equation:
     def getVisType(self) -> VisType:
         return self._visType
 
+    def getPos(self) -> tuple[float, float]:
+        '''Scene position of the item showing equation, kept while item isn't built'''
+        return self._pos
+
+    def setPos(self, pos: tuple[float, float]) -> None:
+        self._pos = pos
+
+    def getTimings(self) -> EqTimings:
+        '''How long the last evaluation, layout and plot of equation took'''
+        return self._timings
+
     def getMyVarName(self) -> str | None:
         return self._myVarName
 
-    def setMyVarName(self, varName: str) -> None:
+    def setMyVarName(self, varName: str | None) -> None:
         self._myVarName = varName
 
+    def getExprStream(self) -> str:
+        return self._lexed.getExprStream()
+
+    def getSides(self) -> tuple[str, str] | None:
+        return self._lexed.getSides()
+
+    def getFunctions(self) -> list[str]:
+        return self._lexed.getFunctions()
+
+    def getParams(self) -> list[str]:
+        return self._lexed.getParams()
+
     def getVarsIDepOn(self) -> list[str]:
         return self._varsIDepOn
 
     def setVarsIDepOn(self, varsIDepOn: list[str]) -> None:
         self._varsIDepOn = varsIDepOn
 
+    def getDepVersions(self) -> tuple[int, ...]:
+        return self._depVersions
+
+    def setDepVersions(self, depVersions: tuple[int, ...]) -> None:
+        self._depVersions = depVersions
+
     def setIsDependent(self, isDep: bool) -> None:
         self._isDependent = isDep
 
+    def getIsDependent(self) -> bool:
+        return self._isDependent
+
     def setHasCyclicDepInfo(self, hasCyclicDep: bool) -> None:
         self._hasCyclicDepInfo = hasCyclicDep
 
@@ -83,5 +144,18 @@ class Equation:
     def getRecalculationReq(self) -> bool:
         return self._recalculationReq
 
+    # Internal
+    def _applyLexed(self) -> None:
+        lexed = self._lexed
+        if lexed.isAssign():
+            self._evalType = EqEvalType.Assign
+        elif lexed.isSolve():
+            self._evalType = EqEvalType.Solve
+        else:
+            self._evalType = EqEvalType.Eval
+        self._myVarName = lexed.getVarName()
+        self._varsIDepOn = lexed.getSymbols()
+
 class NoneEquation(Equation):
-    '''Object that stores either empty equation or error'''
\ No newline at end of file
+    '''Object that stores either empty equation or error'''
+    __slots__ = ()
\ No newline at end of file
@@ -0,0 +1,62 @@
+from heapq import heappop, heappush
+from threading import Lock
+from yamcsolve.Equation import Equation
+
+
+class EquationStore(dict):
+    '''Equation id to Equation mapping with stable id allocation. Ids are
+    reserved up front (items need one before their first equation exists) and
+    go back to a free list when the equation is popped; lowest free id is
+    handed out first, so ids stay small and never collide with living ones.
+    Reserving may happen on another thread than the solver runs on.'''
+    def __init__(self) -> None:
+        super().__init__()
+        self._nextId: int = 1
+        self._freeIds: list[int] = []
+        self._reserved: set[int] = set()
+        self._lock: Lock = Lock()
+
+    # Public
+    def reserveId(self) -> int:
+        with self._lock:
+            id = heappop(self._freeIds) if self._freeIds else self._nextId
+            if id == self._nextId:
+                self._nextId += 1
+            self._reserved.add(id)
+            return id
+
+    def releaseId(self, id: int) -> None:
+        '''Returns id to free list unless an equation still uses it'''
+        with self._lock:
+            if id in self._reserved and id not in self:
+                self._reserved.discard(id)
+                heappush(self._freeIds, id)
+
+    def isReserved(self, id: int) -> bool:
+        return id in self._reserved
+
+    def __setitem__(self, id: int, eq: Equation) -> None:
+        with self._lock:
+            if id not in self._reserved:
+                self._reserved.add(id)
+                if id >= self._nextId:
+                    self._freeIds.extend(range(self._nextId, id))
+                    self._freeIds.sort()
+                    self._nextId = id + 1
+                elif id in self._freeIds:
+                    self._freeIds.remove(id)
+                    self._freeIds.sort()
+        super().__setitem__(id, eq)
+
+    def pop(self, id: int, *default) -> Equation:
+        try:
+            return super().pop(id, *default)
+        finally:
+            self.releaseId(id)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._nextId = 1
+            self._freeIds.clear()
+            self._reserved.clear()
@@ -0,0 +1,18 @@
+from yamcsolve.LruCache import LruCache
+import re
+
+
+class EvalCache(LruCache):
+    '''Least recently used cache of evaluated expressions. Keys are built from
+    normalized equation text and versions of variables the equation reads.'''
+
+    # Static methods
+    @staticmethod
+    def normalize(stream: str) -> str:
+        '''Drops whitespace around operators and collapses the rest'''
+        stream = re.sub(r'\s*([^\w.\s])\s*', r'\1', stream.strip())
+        return re.sub(r'\s+', ' ', stream)
+
+    @staticmethod
+    def makeKey(stream: str, names: list[str], versions: tuple[int, ...]) -> tuple:
+        return (EvalCache.normalize(stream), tuple(names), versions)
@@ -0,0 +1,97 @@
+from functools import lru_cache
+import re
+
+
+LEX_CACHE_SIZE: int = 4096
+TOKEN_REGEX = re.compile(r'''
+    (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<name>[A-Za-z_]\w*)
+  | (?P<assign>:=)
+  | (?P<cmp>==|<=|>=|!=)
+  | (?P<eq>=)
+  | (?P<bar>\|)
+  | (?P<paren>\()
+  | (?P<space>\s+)
+  | (?P<op>.)
+''', re.VERBOSE)
+
+class Lexed:
+    '''What a single scan of an equation stream found'''
+    def __init__(self, varName: str | None, exprStream: str, sides: tuple[str, str] | None,
+                 symbols: list[str], functions: list[str], params: list[str]) -> None:
+        self._varName: str | None = varName
+        self._exprStream: str = exprStream
+        self._sides: tuple[str, str] | None = sides
+        self._symbols: list[str] = symbols
+        self._functions: list[str] = functions
+        self._params: list[str] = params
+
+    def isAssign(self) -> bool:
+        return self._varName is not None
+
+    def isSolve(self) -> bool:
+        return self._sides is not None
+
+    def getVarName(self) -> str | None:
+        '''Name defined by "name := ..." equation'''
+        return self._varName
+
+    def getExprStream(self) -> str:
+        '''Part that gets evaluated: right hand side of assignment, without "| params"'''
+        return self._exprStream
+
+    def getSides(self) -> tuple[str, str] | None:
+        '''Left and right hand side of "lh = rh" equation'''
+        return self._sides
+
+    def getSymbols(self) -> list[str]:
+        '''Sorted names used as values in evaluated part'''
+        return list(self._symbols)
+
+    def getFunctions(self) -> list[str]:
+        '''Sorted names called as functions in evaluated part'''
+        return list(self._functions)
+
+    def getParams(self) -> list[str]:
+        '''Whitespace separated words after "|"'''
+        return list(self._params)
+
+@lru_cache(maxsize=LEX_CACHE_SIZE)
+def lex(stream: str) -> Lexed:
+    '''Scans stream once, collecting defined name, symbols, functions and "| params"'''
+    assignEnd: int | None = None
+    eqPos: int | None = None
+    barPos: int | None = None
+    names: list[tuple[int, str]] = []
+    called: set[int] = set()
+    lastName: int | None = None
+    for m in TOKEN_REGEX.finditer(stream):
+        kind = m.lastgroup
+        if kind == 'space':
+            continue
+        if kind == 'paren' and lastName is not None:
+            called.add(lastName)
+        lastName = None
+        if kind == 'name':
+            lastName = len(names)
+            names.append((m.start(), m.group()))
+        elif kind == 'assign' and assignEnd is None and eqPos is None:
+            assignEnd = m.end()
+        elif kind == 'eq' and eqPos is None and assignEnd is None:
+            eqPos = m.start()
+        elif kind == 'bar' and barPos is None:
+            barPos = m.start()
+            break
+
+    end = len(stream) if barPos is None else barPos
+    start = 0 if assignEnd is None else assignEnd
+    varName = stream[:assignEnd - 2].strip() if assignEnd is not None else None
+    sides = (stream[:eqPos], stream[eqPos + 1:end]) if eqPos is not None and eqPos < end else None
+    symbols: set[str] = set()
+    functions: set[str] = set()
+    for i, (pos, name) in enumerate(names):
+        if pos < start:
+            continue
+        (functions if i in called else symbols).add(name)
+    params = stream[barPos + 1:].split() if barPos is not None else []
+    return Lexed(varName, stream[start:end].strip(), sides, sorted(symbols), sorted(functions), params)
@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+
+class LruCache:
+    '''Least recently used cache with hit, miss and eviction counts'''
+    def __init__(self, maxSize: int = 1024) -> None:
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        self._maxSize: int = maxSize
+        self._hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+
+    # Public
+    def get(self, key: tuple) -> object | None:
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def peek(self, key: tuple) -> object | None:
+        '''Value of key without counting a hit or refreshing it'''
+        return self._entries.get(key)
+
+    def put(self, key: tuple, value: object) -> None:
+        if self._maxSize <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def resetStats(self) -> None:
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def setMaxSize(self, maxSize: int) -> None:
+        self._maxSize = maxSize
+        self._evict()
+
+    def getMaxSize(self) -> int:
+        return self._maxSize
+
+    def getHits(self) -> int:
+        return self._hits
+
+    def getMisses(self) -> int:
+        return self._misses
+
+    def getStats(self) -> dict[str, int]:
+        return {'size': len(self._entries), 'maxSize': self._maxSize,
+                'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Internal
+    def _evict(self) -> None:
+        while len(self._entries) > max(self._maxSize, 0):
+            self._entries.popitem(last=False)
+            self._evictions += 1
@@ -0,0 +1,50 @@
+from typing import Callable
+import numpy as np
+
+
+NUMERIC_RANGE: tuple[float, float] = (-100.0, 100.0)
+NUMERIC_SAMPLES: int = 20001
+NUMERIC_TOL: float = 1e-13
+NUMERIC_MAX_ITER: int = 200
+
+def _evalVector(f: Callable, x: np.ndarray) -> np.ndarray:
+    with np.errstate(all='ignore'):
+        y = np.asarray(f(x))
+    if np.iscomplexobj(y):
+        y = np.where(np.abs(y.imag) <= NUMERIC_TOL * (1 + np.abs(y.real)), y.real, np.nan)
+    return np.broadcast_to(y, x.shape).astype(float)
+
+def findRealRoots(f: Callable, a: float = NUMERIC_RANGE[0], b: float = NUMERIC_RANGE[1],
+                  n: int = NUMERIC_SAMPLES, tol: float = NUMERIC_TOL) -> list[float]:
+    '''Finds every real root of vectorized function f on [a, b] that shows up as a
+    sign change or exact zero on n samples. All brackets are refined together by
+    vectorized bisection. Sign changes over poles are rejected.'''
+    x = np.linspace(a, b, int(n))
+    y = _evalVector(f, x)
+    finite = np.isfinite(y)
+    roots: list[np.ndarray] = [x[finite & (y == 0)]]
+
+    s = np.sign(y)
+    idx = np.nonzero(finite[:-1] & finite[1:] & (s[:-1] * s[1:] < 0))[0]
+    lo, hi = x[idx], x[idx + 1]
+    flo = y[idx]
+    scale = np.maximum(np.abs(y[idx]), np.abs(y[idx + 1]))
+    for _ in range(NUMERIC_MAX_ITER):
+        if not lo.size or np.all(hi - lo <= tol * (1 + np.abs(lo))):
+            break
+        mid = 0.5 * (lo + hi)
+        fm = _evalVector(f, mid)
+        left = np.sign(fm) == np.sign(flo)
+        lo = np.where(left, mid, lo)
+        flo = np.where(left, fm, flo)
+        hi = np.where(left, hi, mid)
+    mid = 0.5 * (lo + hi)
+    fm = np.abs(_evalVector(f, mid))
+    # Pole brackets keep growing while they shrink, roots don't
+    roots.append(mid[np.isfinite(fm) & (fm <= scale)])
+
+    found = np.sort(np.concatenate(roots))
+    if found.size:
+        keep = np.concatenate(([True], np.diff(found) > np.sqrt(tol) * (1 + np.abs(found[1:]))))
+        found = found[keep]
+    return found.tolist()
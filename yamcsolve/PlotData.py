@@ -1,6 +1,180 @@
+from collections import OrderedDict
+from typing import Callable
+import numpy as np
+from sympy import lambdify, srepr, Basic
+from yamcsolve.AdaptiveSampler import sampleAdaptive, INITIAL_SAMPLES, SAMPLE_BUDGET
+from yamcsolve.SurfaceEvaluator import SurfaceEvaluator, SURFACE_MAX_BYTES
 
 
+LAMBDA_CACHE_SIZE: int = 256
+DEFAULT_RANGE: tuple[float, float, int] = (-100.0, 100.0, 10)
+
+_lambdaCache: OrderedDict[tuple[str, tuple[str, ...]], Callable] = OrderedDict()
+
+def compileExpr(expr, args: list) -> Callable:
+    '''lambdify to NumPy, cached by canonical expression and argument order'''
+    key = (srepr(expr), tuple(str(a) for a in args))
+    func = _lambdaCache.get(key)
+    if func is None:
+        func = lambdify(args, expr, 'numpy')
+        _lambdaCache[key] = func
+        if len(_lambdaCache) > LAMBDA_CACHE_SIZE:
+            _lambdaCache.popitem(last=False)
+    else:
+        _lambdaCache.move_to_end(key)
+    return func
+
+def toReal(values) -> np.ndarray:
+    '''Float array of values, entries with imaginary part become NaN'''
+    values = np.asarray(values)
+    if np.iscomplexobj(values):
+        values = np.where(np.abs(values.imag) <= 1e-12 * (1 + np.abs(values.real)), values.real, np.nan)
+    return values.astype(float, copy=False)
+
+def parseRange(params: list[str]) -> tuple[float, float, int]:
+    '''Range of "| a b n" words, DEFAULT_RANGE when they don't give one'''
+    try:
+        start, stop = float(params[0]), float(params[1])
+        n = int(float(params[2])) if len(params) > 2 else DEFAULT_RANGE[2]
+    except (IndexError, ValueError):
+        return DEFAULT_RANGE
+    return start, stop, n
+
+def getPlotArgs(expr) -> list:
+    '''Free symbols of expression in stable, name sorted order'''
+    return sorted(getattr(expr, 'free_symbols', ()), key=str)
 
 class PlotData:
-    def __init__(self) -> None:
-        pass
\ No newline at end of file
+    '''Sampled values of an equation result. Compiled function is cached and
+    sample buffers only grow, so changing range or resolution reuses both.'''
+    def __init__(self, expr=None, args: list | None = None) -> None:
+        self._expr = None
+        self._args: list = []
+        self._func: Callable | None = None
+        self._range: tuple[float, float, int] = DEFAULT_RANGE
+        self._range2: tuple[float, float, int] | None = None
+        self._ramp: np.ndarray = np.empty(0)
+        self._xBuf: np.ndarray = np.empty(0)
+        self._yBuf: np.ndarray = np.empty(0)
+        self._resultBuf: np.ndarray = np.empty(0)
+        self._result: np.ndarray = self._resultBuf
+        self._isValid: bool = False
+        self._adaptiveKey: tuple | None = None
+        self._adaptive: tuple[np.ndarray, np.ndarray] = (np.empty(0), np.empty(0))
+        if expr is not None:
+            self.setExpression(expr, args)
+
+    # Public
+    def setExpression(self, expr, args: list | None = None) -> None:
+        args = getPlotArgs(expr) if args is None else list(args)
+        if expr is self._expr and args == self._args:
+            return
+        self._expr = expr
+        self._args = args
+        self._func = None
+        self._isValid = False
+        self._adaptiveKey = None
+
+    def getExpression(self):
+        return self._expr
+
+    def getArgs(self) -> list:
+        return self._args
+
+    def getDims(self) -> int:
+        return len(self._args)
+
+    def isPlottable(self) -> bool:
+        return isinstance(self._expr, Basic) and len(self._args) in (1, 2)
+
+    def setRange(self, start: float, stop: float, n: int) -> None:
+        '''Sampling of first argument, also used for the second one unless setRange2 is called'''
+        newRange = (float(start), float(stop), int(n))
+        if newRange != self._range:
+            self._range = newRange
+            self._isValid = False
+
+    def setRange2(self, start: float, stop: float, n: int) -> None:
+        newRange = (float(start), float(stop), int(n))
+        if newRange != self._range2:
+            self._range2 = newRange
+            self._isValid = False
+
+    def getRange(self) -> tuple[float, float, int]:
+        return self._range
+
+    def getRange2(self) -> tuple[float, float, int]:
+        return self._range2 or self._range
+
+    def getFunction(self) -> Callable:
+        if self._func is None:
+            self._func = compileExpr(self._expr, self._args)
+        return self._func
+
+    def evaluate(self) -> np.ndarray:
+        '''Samples expression over current ranges. Result has shape (n,) for one
+        argument and (n2, n) for two, rows follow the second argument.'''
+        if self._isValid:
+            return self._result
+        func = self.getFunction()
+        a, b, n = self._range
+        x = self._fill('_xBuf', a, b, n)
+        with np.errstate(all='ignore'):
+            if self.getDims() == 2:
+                c, d, m = self.getRange2()
+                y = self._fill('_yBuf', c, d, m)
+                values = func(x[np.newaxis, :], y[:, np.newaxis])
+                result = self._resultView(m * n).reshape(m, n)
+            else:
+                values = func(x)
+                result = self._resultView(n)
+            np.copyto(result, toReal(values))
+        self._result = result
+        self._isValid = True
+        return result
+
+    def sampleAdaptive(self, start: float, stop: float, budget: int | None = None,
+                       initial: int = INITIAL_SAMPLES) -> tuple[np.ndarray, np.ndarray]:
+        '''Curvature driven sampling of one argument expression, see AdaptiveSampler.
+        Returned arrays are not reused, they can be handed to another thread'''
+        budget = SAMPLE_BUDGET if budget is None else budget
+        key = (float(start), float(stop), int(budget), int(initial))
+        if key != self._adaptiveKey:
+            self._adaptive = sampleAdaptive(self.getFunction(), *key)
+            self._adaptiveKey = key
+        return self._adaptive
+
+    def getSurfaceEvaluator(self, dtype=np.float64, maxBytes: int = SURFACE_MAX_BYTES) -> SurfaceEvaluator:
+        '''Progressive, memory bounded evaluation of two argument expression over current ranges'''
+        return SurfaceEvaluator(self.getFunction(), self._range, self.getRange2(), dtype, maxBytes)
+
+    def getX(self) -> np.ndarray:
+        return self._xBuf[:self._range[2]]
+
+    def getY(self) -> np.ndarray:
+        return self._yBuf[:self.getRange2()[2]]
+
+    def getResult(self) -> np.ndarray:
+        return self.evaluate()
+
+    # Internal
+    def _fill(self, name: str, start: float, stop: float, n: int) -> np.ndarray:
+        '''linspace written into reusable buffer'''
+        if self._ramp.size < n:
+            self._ramp = np.arange(max(n, 2 * self._ramp.size), dtype=float)
+        buf: np.ndarray = getattr(self, name)
+        if buf.size < n:
+            buf = np.empty(max(n, 2 * buf.size))
+            setattr(self, name, buf)
+        out = buf[:n]
+        step = (stop - start) / (n - 1) if n > 1 else 0.0
+        np.multiply(self._ramp[:n], step, out=out)
+        out += start
+        if n > 1:
+            out[-1] = stop
+        return out
+
+    def _resultView(self, size: int) -> np.ndarray:
+        if self._resultBuf.size < size:
+            self._resultBuf = np.empty(max(size, 2 * self._resultBuf.size))
+        return self._resultBuf[:size]
@@ -0,0 +1,202 @@
+import importlib
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from multiprocessing.connection import Connection
+
+
+SANDBOX_SIZE: int = 2
+SANDBOX_TIMEOUT: float = 30.0 # s
+SANDBOX_MAX_RSS: int = 2 * 1024**3 # B
+SANDBOX_POLL: float = 0.05 # s
+SANDBOX_START_TIMEOUT: float = 120.0 # s
+TASKS: dict[str, str] = {
+    'integrate': 'sympy:integrate',
+    'diff': 'sympy:diff',
+    'solve': 'sympy:solve',
+    'convert_to': 'sympy.physics.units:convert_to',
+    'evalStream': 'yamcsolve.SymPySolver:evalStream',
+    }
+
+class SandboxError(Exception):
+    '''Raised in caller for exceptions thrown inside worker'''
+
+class SandboxTaskError(SandboxError):
+    '''Exception raised by the task itself, worker stays usable'''
+
+class SandboxTimeout(SandboxError):
+    def __init__(self) -> None:
+        super().__init__('timeout')
+
+class SandboxMemoryLimit(SandboxError):
+    def __init__(self) -> None:
+        super().__init__('memory limit exceeded')
+
+def _resolveTask(name: str):
+    module, func = TASKS[name].split(':')
+    return getattr(importlib.import_module(module), func)
+
+def _workerMain(conn: Connection) -> None:
+    for name in TASKS:
+        _resolveTask(name)
+    conn.send(('ready', None))
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            break
+        if msg is None:
+            break
+        name, args, kwargs = msg
+        try:
+            result = _resolveTask(name)(*args, **kwargs)
+            conn.send(('ok', result))
+        except Exception as e:
+            conn.send(('error', f'{e}'))
+
+def _getRss(pid: int) -> int | None:
+    '''Resident set size of process, None where /proc is not available'''
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+class SandboxWorker:
+    '''Single worker process with SymPy already imported'''
+    def __init__(self, ctx) -> None:
+        self._conn, childConn = ctx.Pipe()
+        self._process = ctx.Process(target=_workerMain, args=(childConn,), daemon=True)
+        self._process.start()
+        childConn.close()
+        self._ready: bool = False
+
+    # Public
+    def waitReady(self, timeout: float = SANDBOX_START_TIMEOUT) -> None:
+        if self._ready:
+            return
+        if not self._conn.poll(timeout):
+            raise SandboxError('worker failed to start')
+        self._conn.recv()
+        self._ready = True
+
+    def call(self, name: str, args: tuple, kwargs: dict, timeout: float, maxRss: int):
+        self.waitReady()
+        self._conn.send((name, args, kwargs))
+        deadline = time.monotonic() + timeout
+        while not self._conn.poll(SANDBOX_POLL):
+            if time.monotonic() > deadline:
+                raise SandboxTimeout()
+            rss = _getRss(self._process.pid) # type: ignore
+            if rss is not None and rss > maxRss:
+                raise SandboxMemoryLimit()
+            if not self._process.is_alive():
+                raise SandboxError('worker died')
+        status, result = self._conn.recv()
+        if status == 'error':
+            raise SandboxTaskError(result)
+        return result
+
+    def kill(self) -> None:
+        self._process.kill()
+        self._process.join()
+        self._conn.close()
+
+    def stop(self) -> None:
+        try:
+            self._conn.send(None)
+        except OSError:
+            pass
+        self._process.join(1.0)
+        if self._process.is_alive():
+            self.kill()
+
+class SandboxPool:
+    '''Pool of pre-warmed worker processes running expensive SymPy calls.
+    Call that runs longer than timeout or grows above maxRss gets its worker
+    killed and replaced, and raises SandboxTimeout or SandboxMemoryLimit.'''
+    def __init__(self, size: int = SANDBOX_SIZE, timeout: float = SANDBOX_TIMEOUT,
+                 maxRss: int = SANDBOX_MAX_RSS) -> None:
+        self._ctx = mp.get_context('spawn')
+        self._timeout: float = timeout
+        self._maxRss: int = maxRss
+        self._size: int = size
+        self._idle: queue.Queue[SandboxWorker] = queue.Queue()
+        for _ in range(size):
+            self._idle.put(SandboxWorker(self._ctx))
+
+    # Public
+    def call(self, name: str, *args, timeout: float | None = None, **kwargs):
+        timeout = self._timeout if timeout is None else timeout
+        worker = self._idle.get()
+        try:
+            return worker.call(name, args, kwargs, timeout, self._maxRss)
+        except SandboxTaskError:
+            raise
+        except SandboxError:
+            worker.kill()
+            worker = SandboxWorker(self._ctx)
+            raise
+        except (OSError, EOFError) as e:
+            worker.kill()
+            worker = SandboxWorker(self._ctx)
+            raise SandboxError('worker died') from e
+        finally:
+            self._idle.put(worker)
+
+    def warmUp(self) -> None:
+        '''Blocks until all workers have SymPy imported'''
+        workers = [self._idle.get() for _ in range(self._size)]
+        try:
+            for worker in workers:
+                worker.waitReady()
+        finally:
+            for worker in workers:
+                self._idle.put(worker)
+
+    def setLimits(self, timeout: float, maxRss: int) -> None:
+        self._timeout = timeout
+        self._maxRss = maxRss
+
+    def getTimeout(self) -> float:
+        return self._timeout
+
+    def getMaxRss(self) -> int:
+        return self._maxRss
+
+    def getSize(self) -> int:
+        return self._size
+
+    def shutdown(self) -> None:
+        for _ in range(self._size):
+            self._idle.get().stop()
+
+class SandboxedFunction:
+    '''Callable standing in for a SymPy function inside parsing namespaces'''
+    def __init__(self, name: str) -> None:
+        self._name: str = name
+
+    def __call__(self, *args, **kwargs):
+        try:
+            return getSandboxPool().call(self._name, *args, **kwargs)
+        except SandboxError:
+            raise
+        except Exception:
+            # Arguments that can't be pickled are evaluated in process
+            return _resolveTask(self._name)(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f'SandboxedFunction({self._name!r})'
+
+
+_pool: SandboxPool | None = None
+_poolLock = threading.Lock()
+
+def getSandboxPool() -> SandboxPool:
+    global _pool
+    with _poolLock:
+        if _pool is None:
+            _pool = SandboxPool()
+        return _pool
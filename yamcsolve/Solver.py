@@ -1,7 +1,7 @@
 from numpy import (
         ndarray, array, transpose,
         linspace, arange, append,
-        meshgrid, e, pi)
+        meshgrid, broadcast_to, e, pi)
 from sympy import (
         sympify, lambdify, solve,
         simplify, integrate, diff, latex,
@@ -17,22 +17,28 @@ from sympy.parsing.sympy_parser import (
         parse_expr, 
         standard_transformations, 
         implicit_multiplication_application)
-import re
+from yamcsolve.SandboxPool import SandboxedFunction
+from yamcsolve.PlotData import compileExpr
+from yamcsolve.AdaptiveSampler import sampleAdaptive, SAMPLE_BUDGET
+from yamcsolve.SurfaceEvaluator import SurfaceEvaluator
+from yamcsolve.SymbolTable import SymbolTable
+from yamcsolve.Lexer import Lexed, lex
+from yamcsolve.Dimensions import DISPLAY_UNITS, convertUnits, simplifyUnits
 
 
 SI_UNITS: list = ["m", "kg", "s", "A", "K", "mol", "cd"]
-SI_EXTENDED: dict = {'kg*m*s**-1': "N"}
+SI_EXTENDED: dict = DISPLAY_UNITS # dimension vector to display unit
 FUNCTIONS: dict = { # Math functions
                     'log':log, 'sin':sin, 'cos':cos, 'sinh':sinh, 'cosh':cosh, 'tan':tan, 'tanh':tanh,
-                    'asin':asin, 'acos':acos, 'asinh':asinh, 'acosh':acosh, 'ln':ln, 'sqrt':sqrt, 'solve':solve,
-                    'D': diff, 'I': integrate,
+                    'asin':asin, 'acos':acos, 'asinh':asinh, 'acosh':acosh, 'ln':ln, 'sqrt':sqrt, 'solve':SandboxedFunction('solve'),
+                    'D': SandboxedFunction('diff'), 'I': SandboxedFunction('integrate'),
                     # Units
                     'm':m, 'kg':kg,'s':s, 'A':A,
                     'K':K, 'mole':mole, 'cd':cd, 'N':N, 'Pa':Pa,
                     # Sympy functions
-                    'convertUnits':convert_to, 'lt': latex
+                    'convertUnits':convertUnits, 'simplifyUnits':simplifyUnits, 'lt': latex
                     }
-EVAL_REGEX: str = r'([^|]*)\|?(.*)?$'
+DEFERRED: list[str] = ['solve', 'D', 'I', 'convertUnits', 'simplifyUnits'] # run after variable substitution
 
 def parseEq(eq: str) -> str:
     try:
@@ -44,29 +50,27 @@ def parseEq(eq: str) -> str:
         return eq
 
 def getUnsignedSymbols(eq) -> list[str]:
-    res: list = re.findall(r'[a-zA-Z]+', eq)
-    res = list(set(res))
-    res = [x for x in res if x not in FUNCTIONS]
-    return res
+    return getSymbols(eq)
 
 def getSymbols(eq) -> list[str]:
-    res: list = re.findall(r'[a-zA-Z]+', eq)
-    return list(set([x for x in res if x not in FUNCTIONS]))
+    return [x for x in lex(eq).getSymbols() if x not in FUNCTIONS]
 
 class Solver():
-    varDict: dict = {}
+    varDict: SymbolTable = SymbolTable(FUNCTIONS, DEFERRED)
 
     def __init__(self, input: str = '') -> None:
         self._additionalData: dict = {}
         self._input: str = input
+        self._lexed: Lexed = lex(input)
         self._definition: bool = self._isDefinition()
 #        self._equation: str = parseEq(self._getEquation()) #TODO fix parsing longer varnames, currently 2area = 2*a**2r*2.6
         self._equation: str = self._getEquation()
         self._parameters: (list | None) = self._getParametrs()
         self._varName: str = self._getVarName()
         self._latex: str = ''
+        self._resultExpr = None
         self._result: str = self._solve()
-        self._unsingedSymbols: int = len(getUnsignedSymbols(self._result))
+        self._unsingedSymbols: int = len(getattr(self._resultExpr, 'free_symbols', ()))
 
     ### Public
     def eval(self, input: str):
@@ -99,94 +103,59 @@ class Solver():
         self._latex = latex
 
     def _solve(self) -> str:
-        eq = self._equation
-        syms = getSymbols(eq)
         varDict = type(self).varDict
-        for i in syms:
-            if i in varDict.keys() and i not in FUNCTIONS.keys():
-                eq = eq.replace(i, f'({str(varDict[i])})')
-        syms02 = getSymbols(eq)
-        for i in syms02:
-            if i not in FUNCTIONS.keys():
-                exec(f"{i} = Symbol('{i}')")
         try:
-            equation = sympify(eq, locals=FUNCTIONS)
+            equation = varDict.evaluate(self._equation)
+            self._resultExpr = equation
             self._setLatex(f'={latex(equation)}')
             if self._definition and self._varName:
-                varDict[self._varName] = str(equation)
+                varDict[self._varName] = equation
             return str(equation)
         except Exception as e:
             return f'Error: {str(e)}'
 
     def _isDefinition(self) -> bool:
-        return bool(re.findall(r'=', self._input))
+        return self._lexed.isSolve() or self._lexed.isAssign()
 
     def _getEquation(self) -> str:
-        if self._isDefinition():
-            eq: str = re.split(r'=', self._input)[1]
-            res: (tuple | str) = re.findall(EVAL_REGEX, eq)[0]
-        else:
-            res: (tuple | str) = re.findall(EVAL_REGEX, self._input)[0]
-        if isinstance(res, tuple):
-            return res[0]
-        else:
-            return res
+        sides = self._lexed.getSides()
+        return sides[1] if sides else self._lexed.getExprStream()
 
     def _getParametrs(self) -> (list | None):
-        if self._isDefinition():
-            eq: str = re.split(r'=', self._input)[1]
-        else:
-            eq = self._input
-        res: (tuple | str) = re.findall(EVAL_REGEX, eq)[0]
-        if isinstance(res, tuple) and res[1]:
-            params: str = res[1]
-            resList = params.split(' ')
-            resList = [float(x) for x in resList]
-            return resList
-        else:
-            return None
+        params = self._lexed.getParams()
+        return [float(x) for x in params] if params else None
 
     def _getVarName(self) -> str:
-        if self._isDefinition():
-            return (re.split(r'=', self._input)[0]).strip()
-        else:
-            return ''
+        sides = self._lexed.getSides()
+        if sides:
+            return sides[0].strip()
+        return self._lexed.getVarName() or ''
 
     def _plotter(self):
-        eq = self._equation
-        syms = getSymbols(eq)
-        varDict = type(self).varDict
-        for i in syms:
-            if i in varDict.keys() and i not in FUNCTIONS:
-                eq = eq.replace(i, f'({str(varDict[i])})')
-        syms02 = getSymbols(eq)
-        for i in syms02:
-            if i not in FUNCTIONS:
-                exec(f"{i} = Symbol('{i}')")
-        sympy_equation = simplify(eq)
-        args: list = [x for x in list(set(syms02)) if x not in FUNCTIONS]
-        numpy_equation = lambdify(args, sympy_equation, 'numpy')
+        sympy_equation = type(self).varDict.evaluate(self._equation)
+        args: list = sorted(sympy_equation.free_symbols, key=str)
+        numpy_equation = compileExpr(sympy_equation, args)
         match self._unsingedSymbols:
             case 2:
                 if self._parameters:
-                    X, Y = meshgrid(linspace(self._parameters[0],
-                                             self._parameters[1],
-                                             int(self._parameters[2])),
-                                    linspace(self._parameters[0],
-                                             self._parameters[1],
-                                             int(self._parameters[2])))
+                    surface = SurfaceEvaluator(numpy_equation, (self._parameters[0],
+                                                                self._parameters[1],
+                                                                int(self._parameters[2])))
                 else:
-                    X, Y = meshgrid(linspace(-100, 100, 10), linspace(-100, 100, 10))
-                equation = numpy_equation(X, Y)
-                self._additionalData['X'] = X
-                self._additionalData['Y'] = Y
+                    surface = SurfaceEvaluator(numpy_equation, (-100, 100, 10))
+                self._additionalData['surface'] = surface
+                equation = surface.evaluate()
+                # Broadcast views keep meshgrid shape without its memory
+                self._additionalData['X'] = broadcast_to(surface.getX(), equation.shape)
+                self._additionalData['Y'] = broadcast_to(surface.getY()[:, None], equation.shape)
             case _:
+                # a b n parameters give range and point budget of adaptive sampling
                 if self._parameters:
-                    x = linspace(self._parameters[0],
-                                 self._parameters[1],
-                                 int(self._parameters[2]))
+                    x, equation = sampleAdaptive(numpy_equation,
+                                                 self._parameters[0],
+                                                 self._parameters[1],
+                                                 int(self._parameters[2]) if len(self._parameters) > 2 else SAMPLE_BUDGET)
                 else:
-                    x = linspace(-100, 100, 10)
+                    x, equation = sampleAdaptive(numpy_equation, -100, 100)
                 self._additionalData['X'] = x
-                equation = numpy_equation(x)
         return equation
@@ -0,0 +1,96 @@
+from typing import Callable, Iterator
+import numpy as np
+
+
+SURFACE_MAX_BYTES: int = 256 * 1024**2
+COARSE_SIZE: int = 48
+TEMP_FACTOR: int = 4 # temporaries NumPy keeps per evaluated element
+
+# (level, row start, row stop, col start, col stop), level 0 is the coarse preview
+# covering whole grid, its values come from getPreview instead of getResult
+SurfaceTile = tuple[int, int, int, int, int]
+
+class SurfaceEvaluator:
+    '''Evaluates two argument function f(x, y) on a grid without building a
+    meshgrid. A small coarse preview of the whole grid comes first, then the grid
+    is evaluated tile by tile so callers can show each tile as it completes. Result
+    and per-tile temporaries stay below maxBytes; resolution is reduced when the
+    result alone wouldn't fit.'''
+    def __init__(self, func: Callable, xRange: tuple[float, float, int], yRange: tuple[float, float, int] | None = None,
+                 dtype=np.float64, maxBytes: int = SURFACE_MAX_BYTES, coarse: int = COARSE_SIZE) -> None:
+        yRange = xRange if yRange is None else yRange
+        self._func: Callable = func
+        self._dtype = np.dtype(dtype)
+        self._maxBytes: int = maxBytes
+        self._coarse: int = coarse
+        nx, ny = int(xRange[2]), int(yRange[2])
+        itemSize = self._dtype.itemsize
+        # Result takes at most half of the ceiling, rest is for tile temporaries
+        scale = min(1.0, np.sqrt(maxBytes / 2 / max(1, nx * ny * itemSize)))
+        self._isReduced: bool = scale < 1.0
+        nx, ny = max(2, int(nx * scale)), max(2, int(ny * scale))
+        self._x: np.ndarray = np.linspace(xRange[0], xRange[1], nx, dtype=self._dtype)
+        self._y: np.ndarray = np.linspace(yRange[0], yRange[1], ny, dtype=self._dtype)
+        self._result: np.ndarray = np.empty((ny, nx), dtype=self._dtype)
+        tileElems = max(1, (maxBytes - self._result.nbytes) // (TEMP_FACTOR * itemSize))
+        self._tileCols: int = min(nx, max(1, int(np.sqrt(tileElems))))
+        self._tileRows: int = min(ny, max(1, tileElems // self._tileCols))
+        self._preview: np.ndarray = np.empty((0, 0), dtype=self._dtype)
+        self._cancelled: bool = False
+
+    # Public
+    def getX(self) -> np.ndarray:
+        return self._x
+
+    def getY(self) -> np.ndarray:
+        return self._y
+
+    def getResult(self) -> np.ndarray:
+        '''Result array with rows following y, filled in place while tiles complete'''
+        return self._result
+
+    def getPreview(self) -> np.ndarray:
+        '''Coarse samples at evenly spaced grid points, coarse x coarse'''
+        return self._preview
+
+    def getShape(self) -> tuple[int, int]:
+        return self._result.shape # type: ignore
+
+    def isReduced(self) -> bool:
+        return self._isReduced
+
+    def getTileShape(self) -> tuple[int, int]:
+        return self._tileRows, self._tileCols
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def iterTiles(self) -> Iterator[SurfaceTile]:
+        ny, nx = self._result.shape
+        if self._coarse and min(nx, ny) > 2 * self._coarse:
+            cx = np.linspace(0, nx - 1, self._coarse).round().astype(int)
+            cy = np.linspace(0, ny - 1, self._coarse).round().astype(int)
+            self._preview = np.array(self._eval(self._x[cx], self._y[cy]), dtype=self._dtype)
+            yield (0, 0, ny, 0, nx)
+        for r0 in range(0, ny, self._tileRows):
+            r1 = min(ny, r0 + self._tileRows)
+            for c0 in range(0, nx, self._tileCols):
+                if self._cancelled:
+                    return
+                c1 = min(nx, c0 + self._tileCols)
+                self._result[r0:r1, c0:c1] = self._eval(self._x[c0:c1], self._y[r0:r1])
+                yield (1, r0, r1, c0, c1)
+
+    def evaluate(self, onTile: Callable[[SurfaceTile], None] | None = None) -> np.ndarray:
+        for tile in self.iterTiles():
+            if onTile is not None:
+                onTile(tile)
+        return self._result
+
+    # Internal
+    def _eval(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        with np.errstate(all='ignore'):
+            values = np.asarray(self._func(x[np.newaxis, :], y[:, np.newaxis]))
+        if np.iscomplexobj(values):
+            values = np.where(np.abs(values.imag) <= 1e-12 * (1 + np.abs(values.real)), values.real, np.nan)
+        return np.broadcast_to(values, (y.size, x.size))
@@ -1,58 +1,219 @@
-from sympy import symbols, Eq, solve #type: ignore
+from sympy import Eq, lambdify, Float #type: ignore
 from sympy.parsing.sympy_parser import (
     parse_expr,# standard_transformations,
 #    implicit_multiplication_application, convert_xor
 )
-import re
-from yamcsolve.PlotData import PlotData
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+import builtins
+import types
+import os
+from yamcsolve.PlotData import PlotData, parseRange
 from yamcsolve.Equation import Equation, NoneEquation
 from yamcsolve.Equation import EqEvalType
+from yamcsolve.EquationStore import EquationStore
+from yamcsolve.DependencyGraph import DependencyGraph
+from yamcsolve.VarTable import VarTable
+from yamcsolve.EvalCache import EvalCache
+from yamcsolve.SandboxPool import SandboxedFunction, SandboxPool, SandboxError, SandboxTimeout, SandboxTaskError
+from yamcsolve.NumericSolver import findRealRoots
+from yamcsolve.Worksheet import hashValue
 
-#m = re.split(r'(?<![<>!]):?=', s_norm)
-ASSIGN_REGEX: str = r'(?<![<>!]):='
-SOLVE_REGEX: str = r'(?<![<>!])='
+CACHE_SIZE: int = 1024
+SANDBOXED: list[str] = ['integrate', 'diff', 'solve']
+SOLVE_BUDGET: float = 2.0 # s
+
+_globalDicts: dict[bool, dict] = {}
+
+def getGlobalDict(sandboxed: bool = False) -> dict:
+    '''Namespace parse_expr would otherwise rebuild with "from sympy import *" on every call,
+    with units and the Dimensions conversions added. Sandboxed namespace runs SANDBOXED
+    functions in worker processes'''
+    if sandboxed not in _globalDicts:
+        globalDict: dict = {}
+        exec('from sympy import *', globalDict)
+        for name, obj in vars(builtins).items():
+            if isinstance(obj, types.BuiltinFunctionType):
+                globalDict[name] = obj
+        globalDict['max'] = globalDict['Max']
+        globalDict['min'] = globalDict['Min']
+        # Units by full name (meter, newton), short ones like m or s stay free for variables
+        from yamcsolve.Dimensions import UNIT_TABLE, convertUnits, simplifyUnits
+        globalDict.update({str(unit): unit for unit in UNIT_TABLE})
+        globalDict['convertUnits'] = convertUnits
+        globalDict['simplifyUnits'] = simplifyUnits
+        if sandboxed:
+            for name in SANDBOXED:
+                globalDict[name] = SandboxedFunction(name)
+        _globalDicts[sandboxed] = globalDict
+    return _globalDicts[sandboxed]
 
 class SymPySolver:
     '''Singelton Solver object. It handles all solving and storing of app data'''
-    def __init__(self) -> None:
-        self._equations: dict[int, Equation] = {}
-        self._varDict: dict[str, str] = {}
+    def __init__(self, cacheSize: int = CACHE_SIZE, sandboxed: bool = True,
+                 equations: EquationStore | None = None) -> None:
+        self._equations: EquationStore = EquationStore() if equations is None else equations
+        self._varDict: VarTable = VarTable()
         self._plotData: dict[int, PlotData] = {}
+        self._plotParams: dict[int, list[str]] = {} # "| a b n" words plot ranges were last set from
+        self._graph: DependencyGraph = DependencyGraph()
+        self._flagged: set[int] = set() # flagged for recalculation since last recompute
+        self._cache: EvalCache = EvalCache(cacheSize)
+        self._globalDict: dict = getGlobalDict(sandboxed)
+        self._parallelPool: SandboxPool | None = None
+        self._dispatcher: ThreadPoolExecutor | None = None
 
     # Public
-    def recomputeAll(self) -> None:
-        pass
+    def recomputeAll(self, onEvaluated: Callable[[int], None] | None = None) -> list[int]:
+        '''Recomputes every equation flagged for recalculation, definitions first.
+        Returns ids of recomputed equations in evaluation order, onEvaluated gets
+        each id as soon as its result is stored'''
+        dirty = [i for i, eq in self._equations.items() if eq.getRecalculationReq()]
+        self._flagged.clear()
+        return self._recompute(dirty, {i for i in dirty if self._equations[i].getIsChanged()}, onEvaluated)
+
+    def restore(self, stored: dict[int, tuple], onEvaluated: Callable[[int], None] | None = None) -> list[int]:
+        '''recomputeAll that takes stored (result, dependency hashes) of an equation
+        instead of evaluating it while hashes match current values of variables read'''
+        dirty = [i for i, eq in self._equations.items() if eq.getRecalculationReq()]
+        self._flagged.clear()
+        return self._recompute(dirty, set(), onEvaluated, stored)
+
+    def recompute(self, id: int, onEvaluated: Callable[[int], None] | None = None) -> list[int]:
+        '''Recomputes equation and everything downstream of it, together with equations
+        flagged since last recompute, like readers of a name the equation no longer defines'''
+        if id not in self._equations:
+            return []
+        ids = [id, *(i for i in self._flagged if i != id and i in self._equations)]
+        self._flagged.clear()
+        return self._recompute(ids, {id}, onEvaluated)
 
     def evalEq(self, id: int) -> None:
-        self.updateVarDict()
         eq = self._equations[id]
-        eqStream = eq.getStream()
+        timings = eq.getTimings()
+        self._beginEval(eq)
+        hits, misses = self._cache.getHits(), self._cache.getMisses()
         try:
-            if len(re.split(ASSIGN_REGEX, eqStream)) == 2:
-                self.assignSolve(eq, self._varDict)
-            elif len(re.split(SOLVE_REGEX, eqStream)) == 2:
-                pass
-            else:
-                self.evalSolve(eq, self._varDict)
+            with timings.measure('evaluate'):
+                self.solveEq(eq, self._varDict, self._cache, self._globalDict)
         except Exception as e:
-            print(f'recomputeEq failed due to: {e}')
+            self._failEval(eq, e)
+        if self._cache.getHits() > hits:
+            timings.setCacheHit(True)
+        else:
+            timings.setCacheHit(False if self._cache.getMisses() > misses else None)
+
+    def isStale(self, id: int) -> bool:
+        '''True when any variable the equation reads changed since its last evaluation'''
+        eq = self._equations[id]
+        return eq.getDepVersions() != self._varDict.getVersions(eq.getVarsIDepOn())
+
+    def getDepHashes(self, id: int) -> dict[str, str] | None:
+        '''Hashes of values the result was computed from, None if it's out of date'''
+        eq = self._equations[id]
+        result = eq.getResult()
+        if eq.getRecalculationReq() or self.isStale(id) or (isinstance(result, str) and result.startswith('Error')):
+            return None
+        return {name: hashValue(self._varDict.get(name)) for name in eq.getVarsIDepOn()}
+
+    def getVarVersion(self, varName: str) -> int:
+        return self._varDict.getVersion(varName)
+
+    def warmUp(self) -> None:
+        '''Evaluates throwaway equation so parser and namespace are loaded'''
+        self.solveEq(Equation('x + 1'), VarTable(), None, self._globalDict)
+
+    def getCache(self) -> EvalCache:
+        return self._cache
+
+    def setCacheSize(self, cacheSize: int) -> None:
+        self._cache.setMaxSize(cacheSize)
+
+    def setSandboxed(self, sandboxed: bool) -> None:
+        '''Runs integrate, diff and solve in time and memory limited worker processes'''
+        self._globalDict = getGlobalDict(sandboxed)
+        self._cache.clear()
+
+    def setParallel(self, workers: int | None = None) -> None:
+        '''Evaluates independent equations of each dependency level concurrently
+        on a pool of worker processes, one per core by default. Values of a level
+        are merged before the next one starts. workers <= 1 evaluates serially'''
+        if self._parallelPool is not None:
+            self._parallelPool.shutdown()
+            self._dispatcher.shutdown() # type: ignore
+            self._parallelPool = None
+            self._dispatcher = None
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        if workers > 1:
+            self._parallelPool = SandboxPool(size=workers)
+            self._dispatcher = ThreadPoolExecutor(workers)
+
+    def isParallel(self) -> bool:
+        return self._parallelPool is not None
 
     def addEquation(self, id: int, eq: str) -> None:
-        newEq = Equation(eq)
-        self._equations[id] = newEq
-    
+        '''Adds equation or updates stream of existing one. Changed equation
+        and everything downstream of it is flagged for recalculation'''
+        oldEq = self._equations.get(id)
+        if oldEq is not None and oldEq.getStream() == eq:
+            return
+        affected: set[int] = {id}
+        oldName: str | None = None
+        if oldEq is not None:
+            oldName = oldEq.getMyVarName()
+            if oldName:
+                affected |= self._graph.getReaders(oldName)
+            oldEq.setStream(eq)
+            newEq = oldEq
+        else:
+            newEq = Equation(eq)
+            self._equations[id] = newEq
+        self._graph.setNode(id, newEq.getMyVarName(), newEq.getVarsIDepOn())
+        if oldName and oldName != newEq.getMyVarName():
+            self._publishVar(oldName)
+        newEq.setIsChanged(True)
+        self._flagDownstream(affected)
+
     def popEquation(self, id: int) -> None:
         try:
-            self._equations.pop(id)
+            eq = self._equations.pop(id, None)
+            if eq is None:
+                return # id was only reserved
+            self._plotData.pop(id, None)
+            self._plotParams.pop(id, None)
+            self._graph.removeNode(id)
+            varName = eq.getMyVarName()
+            if varName:
+                self._publishVar(varName)
+                self._flagDownstream(self._graph.getReaders(varName))
         except Exception as e:
             print(f'popEquation failed due to: {e}')
 
     def getFreeId(self) -> int:
-        lastKey = len(self._equations.keys())
-        return lastKey + 1
+        '''Reserves id for a new equation, popEquation gives it back'''
+        return self._equations.reserveId()
 
     def getPlotData(self, id: int) -> PlotData | None:
-        pass
+        '''Sampling data of equation result, None when result can't be plotted.
+        PlotData is kept per equation so compiled function and buffers are reused.
+        Ranges of both arguments are set from "| a b n" suffix whenever it changes'''
+        eq = self._equations.get(id)
+        if eq is None:
+            return None
+        plotData = self._plotData.get(id)
+        if plotData is None:
+            plotData = PlotData()
+        plotData.setExpression(eq.getResult())
+        if not plotData.isPlottable():
+            return None
+        params = eq.getParams()
+        if self._plotParams.get(id) != params:
+            self._plotParams[id] = params
+            plotRange = parseRange(params)
+            plotData.setRange(*plotRange)
+            plotData.setRange2(*plotRange)
+        self._plotData[id] = plotData
+        return plotData
 
     def getEquation(self, id: int) -> Equation:
         try:
@@ -63,33 +224,249 @@ class SymPySolver:
     def getAllEquations(self) -> list[Equation]:
         return list(self._equations.values())
 
+    def getEquationItems(self) -> list[tuple[int, Equation]]:
+        return list(self._equations.items())
+
     def getAllEquationsStream(self) -> list[str]:
         return [i.getStream() for i in self._equations.values()]
 
     def updateVarDict(self) -> None:
-        self._varDict.clear()
+        '''Rebuilds whole variable table from stored results'''
+        self._varDict.clearVars()
         for i in self._equations.values():
             varName = i.getMyVarName()
             if varName:
-                self._varDict[varName] = i.getResultStream()
+                self._publishVar(varName)
+
+    # Internal
+    def _flagDownstream(self, ids: set[int]) -> None:
+        for i in self._graph.getDownstream(ids):
+            self._equations[i].setRecalculationReq(True)
+            self._flagged.add(i)
+
+    def _publishVar(self, varName: str) -> None:
+        '''Stores result of the equation currently defining varName or drops the variable'''
+        definer = self._graph.getDefiner(varName)
+        if definer is None or self._equations[definer].getRecalculationReq():
+            self._varDict.popVar(varName)
+        else:
+            self._varDict.setVar(varName, self._equations[definer].getResult())
+
+    def _beginEval(self, eq: Equation) -> None:
+        eq.setRecalculationReq(False)
+        eq.setHasCyclicDepInfo(False)
+        eq.setIsChanged(False)
+        eq.setDepVersions(self._varDict.getVersions(eq.getVarsIDepOn()))
+
+    def _finishEval(self, eq: Equation, result) -> None:
+        eq.setResult(result)
+        varName = eq.getMyVarName()
+        if eq.getEvalType() == EqEvalType.Assign and varName:
+            self._varDict.setVar(varName, result)
+
+    def _adopt(self, eq: Equation, result, depHashes: dict[str, str]) -> bool:
+        '''Takes stored result when variables read hash the same as when it was computed'''
+        names = eq.getVarsIDepOn()
+        if set(depHashes) != set(names) or any(hashValue(self._varDict.get(n)) != depHashes[n] for n in names):
+            return False
+        self._beginEval(eq)
+        self._finishEval(eq, result)
+        eq.getTimings().setCacheHit(True)
+        return True
+
+    def _failEval(self, eq: Equation, e: Exception) -> None:
+        print(f'recomputeEq failed due to: {e}')
+        eq.setResultStream(f'Error: {e}')
+        varName = eq.getMyVarName()
+        if varName:
+            self._varDict.popVar(varName)
+
+    def _cacheKey(self, eq: Equation) -> tuple | None:
+        '''Same key parseCached uses for the equation, None for uncached types'''
+        match eq.getEvalType():
+            case EqEvalType.Assign | EqEvalType.Eval:
+                part = eq.getExprStream()
+            case EqEvalType.Solve:
+                part = eq.getStream()
+            case _:
+                return None
+        names = eq.getVarsIDepOn()
+        return EvalCache.makeKey(part, names, self._varDict.getVersions(names))
+
+    def _evalParallel(self, ids: list[int]) -> None:
+        '''Evaluates independent equations on worker processes, results are merged in id order'''
+        jobs: list[tuple[int, tuple | None]] = []
+        for i in ids:
+            eq = self._equations[i]
+            self._beginEval(eq)
+            key = self._cacheKey(eq)
+            cached = self._cache.get(key) if key else None
+            eq.getTimings().setCacheHit(None if key is None else cached is not None)
+            if cached is None:
+                jobs.append((i, key))
+            else:
+                self._finishEval(eq, cached)
+
+        # Workers solve in plain namespace, symbolic solving gets the budget it has in a
+        # sandboxed one here: on timeout equation is evaluated again with numeric search only
+        budget = SOLVE_BUDGET if isinstance(self._globalDict['solve'], SandboxedFunction) else None
+
+        def run(job: tuple[int, tuple | None]):
+            eq = self._equations[job[0]]
+            pool: SandboxPool = self._parallelPool # type: ignore
+            timeout = budget if eq.getEvalType() == EqEvalType.Solve else None
+            with eq.getTimings().measure('evaluate'):
+                varValues = {n: self._varDict[n] for n in eq.getVarsIDepOn() if n in self._varDict}
+                try:
+                    try:
+                        return pool.call('evalStream', eq.getStream(), varValues, timeout=timeout), None
+                    except SandboxTimeout:
+                        if timeout is None:
+                            raise
+                        return pool.call('evalStream', eq.getStream(), varValues, True), None
+                except SandboxError as e:
+                    return None, e
+
+        for (i, key), (result, error) in zip(jobs, self._dispatcher.map(run, jobs)): # type: ignore
+            eq = self._equations[i]
+            if error is not None:
+                self._failEval(eq, error)
+            else:
+                if key:
+                    self._cache.put(key, result)
+                self._finishEval(eq, result)
+
+    def _recompute(self, ids: list[int], forced: set[int],
+                   onEvaluated: Callable[[int], None] | None = None, stored: dict[int, tuple] | None = None) -> list[int]:
+        affected = self._graph.getDownstream(ids)
+        levels, cyclic = self._graph.getLevels(affected)
+        evaluated: list[int] = []
+        for level in levels:
+            todo: list[int] = []
+            for i in level:
+                eq = self._equations[i]
+                eq.setIsDependent(self._graph.isDependent(i))
+                if stored and i in stored and self._adopt(eq, *stored[i]):
+                    evaluated.append(i)
+                    if onEvaluated is not None:
+                        onEvaluated(i)
+                elif i in forced or eq.getIsChanged() or self.isStale(i):
+                    todo.append(i)
+                else:
+                    eq.setRecalculationReq(False)
+            if self._parallelPool is not None and len(todo) > 1:
+                self._evalParallel(todo)
+                if onEvaluated is not None:
+                    for i in todo:
+                        onEvaluated(i)
+            else:
+                for i in todo:
+                    self.evalEq(i)
+                    if onEvaluated is not None:
+                        onEvaluated(i)
+            evaluated += todo
+        for i in cyclic:
+            eq = self._equations[i]
+            eq.setIsDependent(True)
+            eq.setHasCyclicDepInfo(True)
+            eq.setRecalculationReq(False)
+            eq.setResultStream('Error: cyclic dependency')
+            varName = eq.getMyVarName()
+            if varName:
+                self._varDict.popVar(varName)
+            if onEvaluated is not None:
+                onEvaluated(i)
+        return evaluated + cyclic
 
     # Static methods
     @staticmethod
-    def assignSolve(eq: Equation, varDict: dict[str, str]) -> None:
-        eq.setEvalType(EqEvalType.Assign)
-        eqStream: str = eq.getStream()
-        asSplit: list[str] = re.split(ASSIGN_REGEX, eqStream)
-        lh = asSplit[0]
-        rh = asSplit[1]
-        eq.setMyVarName(lh)
-        eq.setResultStream(parse_expr(rh, varDict, evaluate=True))
+    def solveEq(eq: Equation, varDict: VarTable, cache: EvalCache | None = None,
+                globalDict: dict | None = None) -> None:
+        '''Dispatches on eval type the lexer recorded in equation'''
+        match eq.getEvalType():
+            case EqEvalType.Assign:
+                SymPySolver.assignSolve(eq, varDict, cache, globalDict)
+            case EqEvalType.Solve:
+                SymPySolver.solveSolve(eq, varDict, cache, globalDict)
+            case _:
+                SymPySolver.evalSolve(eq, varDict, cache, globalDict)
 
     @staticmethod
-    def solveSolve(eq: Equation) -> None:
-        pass
+    def parseCached(stream: str, names: list[str], varDict: VarTable, cache: EvalCache | None = None,
+                    globalDict: dict | None = None):
+        '''parse_expr that reuses previous result while text and variables read are unchanged'''
+        globalDict = getGlobalDict() if globalDict is None else globalDict
+        if cache is None:
+            return parse_expr(stream, varDict, global_dict=globalDict, evaluate=True)
+        key = EvalCache.makeKey(stream, names, varDict.getVersions(names))
+        result = cache.get(key)
+        if result is None:
+            result = parse_expr(stream, varDict, global_dict=globalDict, evaluate=True)
+            cache.put(key, result)
+        return result
 
     @staticmethod
-    def evalSolve(eq: Equation, varDict: dict[str, str]) -> None:
-        eq.setEvalType(EqEvalType.Eval)
+    def assignSolve(eq: Equation, varDict: VarTable, cache: EvalCache | None = None,
+                    globalDict: dict | None = None) -> None:
+        lh = eq.getMyVarName()
+        eq.setResult(SymPySolver.parseCached(eq.getExprStream(), eq.getVarsIDepOn(), varDict, cache, globalDict))
+        varDict.setVar(lh, eq.getResult()) # type: ignore
+
+    @staticmethod
+    def solveSolve(eq: Equation, varDict: VarTable, cache: EvalCache | None = None,
+                   globalDict: dict | None = None, budget: float = SOLVE_BUDGET, timedOut: bool = False) -> None:
+        '''Solves lh = rh symbolically. When that takes longer than budget (sandboxed
+        namespace only) or SymPy gives up, real roots of single unknown equations are
+        searched numerically. Search range and samples come from "| a b n" suffix.
+        timedOut skips symbolic solving that already ran out of budget elsewhere'''
         eqStream: str = eq.getStream()
-        eq.setResultStream(parse_expr(eqStream, varDict, evaluate=True))
\ No newline at end of file
+        key: tuple | None = None
+        if cache is not None:
+            names = eq.getVarsIDepOn()
+            key = EvalCache.makeKey(eqStream, names, varDict.getVersions(names))
+            cached = cache.get(key)
+            if cached is not None:
+                eq.setResult(cached)
+                return
+        globalDict = getGlobalDict() if globalDict is None else globalDict
+        lh, rh = eq.getSides() # type: ignore
+        expr = parse_expr(f'({lh}) - ({rh})', varDict, global_dict=globalDict, evaluate=True)
+        unknowns: list = sorted(expr.free_symbols, key=str)
+        if not unknowns:
+            result = Eq(expr, 0)
+        else:
+            solveFunc = globalDict['solve']
+            try:
+                if timedOut:
+                    raise SandboxTimeout()
+                if isinstance(solveFunc, SandboxedFunction):
+                    result = solveFunc(expr, *unknowns, timeout=budget)
+                else:
+                    result = solveFunc(expr, *unknowns)
+                if not result and not expr.is_polynomial(*unknowns):
+                    raise NotImplementedError('no symbolic solution')
+            except (SandboxTimeout, SandboxTaskError, NotImplementedError):
+                if len(unknowns) != 1:
+                    raise
+                f = lambdify(unknowns[0], expr, 'numpy')
+                result = [Float(r) for r in findRealRoots(f, *[float(p) for p in eq.getParams()])]
+        if cache is not None and key is not None:
+            cache.put(key, result)
+        eq.setResult(result)
+
+    @staticmethod
+    def evalSolve(eq: Equation, varDict: VarTable, cache: EvalCache | None = None,
+                  globalDict: dict | None = None) -> None:
+        eq.setResult(SymPySolver.parseCached(eq.getExprStream(), eq.getVarsIDepOn(), varDict, cache, globalDict))
+
+def evalStream(stream: str, varValues: dict, solveTimedOut: bool = False):
+    '''Evaluates equation stream against given variable values. Runs in worker processes.
+    solveTimedOut: symbolic solving ran out of SOLVE_BUDGET before, roots are searched numerically'''
+    eq = Equation(stream)
+    varDict = VarTable()
+    varDict.update(varValues)
+    if solveTimedOut and eq.getEvalType() == EqEvalType.Solve:
+        SymPySolver.solveSolve(eq, varDict, timedOut=True)
+    else:
+        SymPySolver.solveEq(eq, varDict)
+    return eq.getResult()
@@ -0,0 +1,65 @@
+from collections import OrderedDict
+from sympy import Basic, Function, Symbol, sympify
+from sympy.core.function import AppliedUndef
+
+
+PARSE_CACHE_SIZE: int = 512
+
+class SymbolTable(dict):
+    '''Variables of legacy Solver, name to SymPy object. Equation text is parsed
+    once into a tree with plain symbols and cached; variable values are then
+    substituted on the tree with xreplace instead of splicing text. Calls of
+    deferred functions (integrals, diffs, ...) stay unevaluated placeholders in
+    the cached tree and run only after substitution.'''
+    def __init__(self, functions: dict | None = None, deferred: list[str] | None = None) -> None:
+        super().__init__()
+        self._functions: dict = {}
+        self._deferred: dict = {}
+        self._locals: dict = {}
+        self._parsed: OrderedDict[str, Basic] = OrderedDict()
+        self.setFunctions(functions or {}, deferred or [])
+
+    # Public
+    def setFunctions(self, functions: dict, deferred: list[str]) -> None:
+        self._functions = functions
+        self._deferred = {name: functions[name] for name in deferred}
+        self._locals = dict(functions)
+        for name in deferred:
+            self._locals[name] = Function(name)
+        self._parsed.clear()
+
+    def parse(self, text: str) -> Basic:
+        '''Parsed tree of text with variables as symbols, cached by text'''
+        expr = self._parsed.get(text)
+        if expr is None:
+            expr = sympify(text, locals=self._locals)
+            self._parsed[text] = expr
+            if len(self._parsed) > PARSE_CACHE_SIZE:
+                self._parsed.popitem(last=False)
+        else:
+            self._parsed.move_to_end(text)
+        return expr
+
+    def substitute(self, expr: Basic) -> Basic:
+        '''Replaces symbols of defined variables with their values'''
+        for _ in range(len(self) + 1):
+            mapping = {s: self[s.name] for s in getattr(expr, 'free_symbols', ()) if isinstance(s, Symbol) and s.name in self}
+            if not mapping:
+                break
+            expr = expr.xreplace(mapping)
+        return expr
+
+    def evaluate(self, text: str):
+        '''Parse (cached), substitute variables, then run deferred function calls'''
+        return self._runDeferred(self.substitute(self.parse(text)))
+
+    # Internal
+    def _runDeferred(self, expr):
+        if not isinstance(expr, Basic) or not expr.args:
+            return expr
+        args = [self._runDeferred(a) for a in expr.args]
+        if isinstance(expr, AppliedUndef) and expr.func.__name__ in self._deferred:
+            return self._deferred[expr.func.__name__](*args)
+        if any(a is not b for a, b in zip(args, expr.args)):
+            return expr.func(*args)
+        return expr
@@ -0,0 +1,40 @@
+class VarTable(dict):
+    '''Variable name to value mapping, passed to parse_expr as local dict.
+    Every change of a variable gets a new, never reused version number so
+    callers can check whether a value changed since they last read it.'''
+    def __init__(self) -> None:
+        super().__init__()
+        self._versions: dict[str, int] = {}
+        self._lastVersion: int = 0
+
+    # Public
+    def setVar(self, name: str, value) -> bool:
+        '''Stores value under name. Returns False when value did not change'''
+        if name in self:
+            old = self[name]
+            if type(old) is type(value) and old == value:
+                return False
+        self[name] = value
+        self._bump(name)
+        return True
+
+    def popVar(self, name: str) -> None:
+        if name in self:
+            self.pop(name)
+            self._bump(name)
+
+    def getVersion(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def getVersions(self, names: list[str]) -> tuple[int, ...]:
+        versions = self._versions
+        return tuple(versions.get(name, 0) for name in names)
+
+    def clearVars(self) -> None:
+        for name in list(self.keys()):
+            self.popVar(name)
+
+    # Internal
+    def _bump(self, name: str) -> None:
+        self._lastVersion += 1
+        self._versions[name] = self._lastVersion
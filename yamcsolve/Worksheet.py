@@ -0,0 +1,114 @@
+from typing import TYPE_CHECKING, Callable
+import hashlib
+import json
+from yamcsolve.Equation import VisType
+if TYPE_CHECKING:
+    from yamcsolve.SymPySolver import SymPySolver
+
+
+FORMAT_NAME: str = 'yamc-worksheet'
+FORMAT_VERSION: int = 1
+FILE_SUFFIX: str = '.yamc'
+
+_unitNames: dict | None = None
+
+class WorksheetError(Exception):
+    '''File is not a worksheet or has unsupported version'''
+
+def hashValue(value) -> str:
+    '''Stable hash of variable value, same across sessions'''
+    from sympy import srepr
+    text = 'missing' if value is None else srepr(value)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+def hashStream(stream: str) -> str:
+    return hashlib.sha1(stream.encode('utf-8')).hexdigest()[:16]
+
+def dumpResult(result) -> dict:
+    '''Result as JSON: error texts verbatim, anything else as srepr'''
+    if isinstance(result, str):
+        return {'text': result}
+    from sympy import srepr
+    return {'srepr': srepr(result)}
+
+def loadResult(data: dict):
+    if 'text' in data:
+        return data['text']
+    from sympy import sympify
+    return sympify(data['srepr'], locals=_getUnitNames())
+
+def makeItem(solver: 'SymPySolver', id: int, pos: tuple[float, float]) -> dict:
+    '''Worksheet record of equation id. deps is None when the result is out of date,
+    then it is recomputed on open'''
+    eq = solver.getEquation(id)
+    plot: dict | None = None
+    if eq.getVisType() == VisType.Plot:
+        plotData = solver.getPlotData(id)
+        if plotData is not None:
+            plot = {'range': list(plotData.getRange()), 'range2': list(plotData.getRange2())}
+    return {'id': id, 'pos': [pos[0], pos[1]], 'stream': eq.getStream(), 'hash': hashStream(eq.getStream()),
+            'visType': eq.getVisType().name, 'result': dumpResult(eq.getResult()),
+            'deps': solver.getDepHashes(id), 'plot': plot}
+
+def writeWorksheet(path: str, solver: 'SymPySolver', positions: dict[int, tuple[float, float]] | None = None) -> None:
+    '''Saves equations with item positions, given ones or those stored in equations'''
+    if positions is None:
+        positions = {id: eq.getPos() for id, eq in solver.getEquationItems()}
+    items = [makeItem(solver, id, pos) for id, pos in positions.items() if solver.getEquation(id).getStream()]
+    data = {'format': FORMAT_NAME, 'version': FORMAT_VERSION, 'items': items}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=1)
+
+def readWorksheet(path: str) -> list[dict]:
+    '''Items of worksheet file, results still serialized so this doesn't need SymPy'''
+    with open(path, encoding='utf-8') as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError as e:
+            raise WorksheetError(f'{path} is not a worksheet: {e}')
+    if not isinstance(data, dict) or data.get('format') != FORMAT_NAME:
+        raise WorksheetError(f'{path} is not a worksheet')
+    if data.get('version', 0) > FORMAT_VERSION:
+        raise WorksheetError(f'{path} has newer version {data["version"]}, {FORMAT_VERSION} supported')
+    return data['items']
+
+def isWorksheetFile(path: str) -> bool:
+    if path.endswith(FILE_SUFFIX):
+        return True
+    with open(path, encoding='utf-8') as f:
+        return f.read(1) == '{'
+
+def restoreWorksheet(solver: 'SymPySolver', items: list[dict], ids: list[int],
+                     onEvaluated: Callable[[int], None] | None = None) -> list[int]:
+    '''Adds items under given ids. Stored results are reused when the hashes of
+    variables they read still match, everything else is recomputed'''
+    stored: dict[int, tuple] = {}
+    for item, id in zip(items, ids):
+        solver.addEquation(id, item['stream'])
+        eq = solver.getEquation(id)
+        eq.setVisType(VisType[item.get('visType', VisType.Text.name)])
+        eq.setPos((float(item['pos'][0]), float(item['pos'][1])))
+        # Result is only trusted for the stream it was computed from
+        if item.get('deps') is not None and item.get('result') is not None and item.get('hash') == hashStream(item['stream']):
+            try:
+                stored[id] = (loadResult(item['result']), item['deps'])
+            except Exception as e:
+                print(f'restoreWorksheet dropped stored result due to: {e}')
+    evaluated = solver.restore(stored, onEvaluated)
+    for item, id in zip(items, ids):
+        plot = item.get('plot')
+        plotData = solver.getPlotData(id) if plot else None
+        if plotData is not None:
+            plotData.setRange(*plot['range']) # type: ignore
+            plotData.setRange2(*plot['range2']) # type: ignore
+    return evaluated
+
+def _getUnitNames() -> dict:
+    '''Quantities by the name srepr prints, so unit results load back as units'''
+    global _unitNames
+    if _unitNames is None:
+        import sympy
+        from sympy.physics import units
+        from sympy.physics.units import Quantity
+        _unitNames = {str(q): q for q in vars(units).values() if isinstance(q, Quantity) and not hasattr(sympy, str(q))}
+    return _unitNames